@@ -3,68 +3,150 @@ Configuration settings for Trading Portfolio
 Centralizes all file paths and settings to avoid hardcoded values
 """
 import os
+import sys
+import hashlib
+import json
 import logging
+from dataclasses import dataclass, fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Union, Any
+from typing import Union, Any, ClassVar
 
-# Get the project root directory
-PROJECT_ROOT = Path(__file__).parent.absolute()
+# Load .env before any setting is read, so Config is the one canonical view of
+# the environment (python-dotenv is optional here)
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Get the project root directory (os.path is cheaper than Path(...).parent.absolute() at import)
+_PROJECT_ROOT_STR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = Path(_PROJECT_ROOT_STR)
+
+# Fingerprint of the last configuration that passed validation
+VALIDATION_CACHE_FILE = Path.home() / ".cache" / "trading_portfolio" / "config_fp"
+
+# Exchange market definitions saved by exchange_handler between runs
+MARKETS_CACHE_DIR = Path.home() / ".cache" / "trading_portfolio" / "markets"
+
+@lru_cache(maxsize=None)
+def _env_str(key: str, default: Any = None) -> Any:
+    """Read an environment variable once; later lookups return the same snapshot"""
+    return os.environ.get(key, default)
+
+@lru_cache(maxsize=None)
+def _env_float(key: str, default: float) -> float:
+    return float(_env_str(key, default))
+
+@lru_cache(maxsize=None)
+def _env_int(key: str, default: int) -> int:
+    return int(_env_str(key, default))
+
+@lru_cache(maxsize=None)
+def _env_bool(key: str, default: str = 'true') -> bool:
+    return str(_env_str(key, default)).lower() == 'true'
 
 class ConfigValidationError(Exception):
     """Custom exception for configuration validation errors"""
     pass
 
-class Config:
+# dataclass(slots=True) needs Python 3.10+; older interpreters get a plain frozen dataclass
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
+class _Settings:
+    """
+    Immutable settings snapshot, built once from the environment by _build_config()
+    Module-level `Config` is the single instance
+    """
     # Database settings
-    DATABASE_PATH = os.getenv('DATABASE_PATH', PROJECT_ROOT / "trading_dashboard.db")
+    DATABASE_PATH: Union[str, Path]
     
     # State management
-    BOT_STATE_FILE = os.getenv('BOT_STATE_FILE', PROJECT_ROOT / "bot_state.json")
-    LIVE_BOT_STATE_FILE = os.getenv('LIVE_BOT_STATE_FILE', PROJECT_ROOT / "live_bot_state.json")
+    BOT_STATE_FILE: Union[str, Path]
+    LIVE_BOT_STATE_FILE: Union[str, Path]
     
     # CSV data files
-    DEFAULT_CSV_DATA = os.getenv('DEFAULT_CSV_DATA', PROJECT_ROOT / "btc_4h_2022_2025_clean.csv")
-    EQUITY_CURVE_CSV = os.getenv('EQUITY_CURVE_CSV', PROJECT_ROOT / "equity_curve.csv")
-    TRADE_HISTORY_CSV = os.getenv('TRADE_HISTORY_CSV', PROJECT_ROOT / "trade_history.csv")
+    DEFAULT_CSV_DATA: Union[str, Path]
+    EQUITY_CURVE_CSV: Union[str, Path]
+    TRADE_HISTORY_CSV: Union[str, Path]
     
     # Log files
-    LOG_FILE = os.getenv('LOG_FILE', PROJECT_ROOT / "trading_bot.log")
+    LOG_FILE: Union[str, Path]
     
     # Summary files
-    DASHBOARD_SUMMARY = os.getenv('DASHBOARD_SUMMARY', PROJECT_ROOT / "dashboard_summary.json")
+    DASHBOARD_SUMMARY: Union[str, Path]
+    
+    # Closed historical candles, reused by fetch_historical_ohlcv
+    OHLCV_CACHE_DIR: Union[str, Path]
     
     # Trading parameters with validation
-    INITIAL_CAPITAL = float(os.getenv('INITIAL_CAPITAL', 4000))
-    POSITION_SIZE_PCT = float(os.getenv('POSITION_SIZE_PCT', 0.015))
-    TRADING_FEE_RATE = float(os.getenv('TRADING_FEE_RATE', 0.001))
-    SLIPPAGE_RATE = float(os.getenv('SLIPPAGE_RATE', 0.0005))
-    MIN_PROFIT_THRESHOLD = float(os.getenv('MIN_PROFIT_THRESHOLD', 0.005))
+    INITIAL_CAPITAL: float
+    POSITION_SIZE_PCT: float
+    TRADING_FEE_RATE: float
+    SLIPPAGE_RATE: float
+    MIN_PROFIT_THRESHOLD: float
     
     # Exchange settings
-    EXCHANGE_NAME = os.getenv('EXCHANGE_NAME', 'binance')  # Default to binance
-    BYBIT_TESTNET = os.getenv('BYBIT_TESTNET', 'true').lower() == 'true'
-    BINANCE_TESTNET = os.getenv('BINANCE_TESTNET', 'true').lower() == 'true'
+    EXCHANGE_NAME: str
+    BYBIT_TESTNET: bool
+    BINANCE_TESTNET: bool
     
     # Streamlit settings
-    STREAMLIT_PORT = int(os.getenv('PORT', 8501))
-    STREAMLIT_HOST = os.getenv('STREAMLIT_HOST', '0.0.0.0')
+    STREAMLIT_PORT: int
+    STREAMLIT_HOST: str
     
     # Risk management limits
-    MAX_POSITION_SIZE_PCT = 0.5  # Maximum 50% position size
-    MIN_POSITION_SIZE_PCT = 0.001  # Minimum 0.1% position size
-    MAX_INITIAL_CAPITAL = 1000000  # Maximum $1M initial capital
-    MIN_INITIAL_CAPITAL = 100  # Minimum $100 initial capital
-    MAX_TRADING_FEE_RATE = 0.01  # Maximum 1% fee rate
-    MAX_SLIPPAGE_RATE = 0.01  # Maximum 1% slippage
-    
-    @classmethod
-    def validate_config(cls) -> bool:
-        """Validate all configuration parameters"""
+    MAX_POSITION_SIZE_PCT: ClassVar[float] = 0.5  # Maximum 50% position size
+    MIN_POSITION_SIZE_PCT: ClassVar[float] = 0.001  # Minimum 0.1% position size
+    MAX_INITIAL_CAPITAL: ClassVar[int] = 1000000  # Maximum $1M initial capital
+    MIN_INITIAL_CAPITAL: ClassVar[int] = 100  # Minimum $100 initial capital
+    MAX_TRADING_FEE_RATE: ClassVar[float] = 0.01  # Maximum 1% fee rate
+    MAX_SLIPPAGE_RATE: ClassVar[float] = 0.01  # Maximum 1% slippage
+    
+    def __call__(self) -> "_Settings":
+        # `Config()` used to instantiate the old class-of-classvars; keep it working
+        return self
+    
+    def _validation_fingerprint(self) -> str:
+        """Short hash of every input validate_config looks at, plus this file's mtime"""
+        relevant = {
+            'BYBIT_API_KEY': os.getenv('BYBIT_API_KEY'),
+            'BYBIT_API_SECRET': os.getenv('BYBIT_API_SECRET'),
+            'INITIAL_CAPITAL': self.INITIAL_CAPITAL,
+            'POSITION_SIZE_PCT': self.POSITION_SIZE_PCT,
+            'TRADING_FEE_RATE': self.TRADING_FEE_RATE,
+            'SLIPPAGE_RATE': self.SLIPPAGE_RATE,
+            'MIN_PROFIT_THRESHOLD': self.MIN_PROFIT_THRESHOLD,
+            'STREAMLIT_PORT': self.STREAMLIT_PORT,
+            'PROJECT_ROOT': _PROJECT_ROOT_STR,
+            'config_mtime': os.stat(__file__).st_mtime_ns,
+        }
+        payload = json.dumps(sorted(relevant.items()), default=str).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def validate_config(self, use_cache: bool = False) -> bool:
+        """
+        Validate all configuration parameters
+        With use_cache=True, skip the checks when the inputs match the last
+        configuration that passed (fingerprint in VALIDATION_CACHE_FILE)
+        """
         logger = logging.getLogger(__name__)
         errors = []
         
+        fingerprint = None
+        if use_cache:
+            try:
+                fingerprint = self._validation_fingerprint()
+                if VALIDATION_CACHE_FILE.read_text().strip() == fingerprint:
+                    return True
+            except OSError:
+                pass
+        
         try:
-            # Validate API keys
+            # Validate API keys (read live, not via _env_str, so keys set after
+            # import are seen)
             api_key = os.getenv('BYBIT_API_KEY')
             api_secret = os.getenv('BYBIT_API_SECRET')
             
@@ -75,27 +157,27 @@ class Config:
                 errors.append("BYBIT_API_SECRET is missing or too short")
             
             # Validate trading parameters
-            if not (cls.MIN_INITIAL_CAPITAL <= cls.INITIAL_CAPITAL <= cls.MAX_INITIAL_CAPITAL):
-                errors.append(f"INITIAL_CAPITAL must be between ${cls.MIN_INITIAL_CAPITAL} and ${cls.MAX_INITIAL_CAPITAL:,}")
+            if not (self.MIN_INITIAL_CAPITAL <= self.INITIAL_CAPITAL <= self.MAX_INITIAL_CAPITAL):
+                errors.append(f"INITIAL_CAPITAL must be between ${self.MIN_INITIAL_CAPITAL} and ${self.MAX_INITIAL_CAPITAL:,}")
             
-            if not (cls.MIN_POSITION_SIZE_PCT <= cls.POSITION_SIZE_PCT <= cls.MAX_POSITION_SIZE_PCT):
-                errors.append(f"POSITION_SIZE_PCT must be between {cls.MIN_POSITION_SIZE_PCT*100}% and {cls.MAX_POSITION_SIZE_PCT*100}%")
+            if not (self.MIN_POSITION_SIZE_PCT <= self.POSITION_SIZE_PCT <= self.MAX_POSITION_SIZE_PCT):
+                errors.append(f"POSITION_SIZE_PCT must be between {self.MIN_POSITION_SIZE_PCT*100}% and {self.MAX_POSITION_SIZE_PCT*100}%")
             
-            if not (0 <= cls.TRADING_FEE_RATE <= cls.MAX_TRADING_FEE_RATE):
-                errors.append(f"TRADING_FEE_RATE must be between 0% and {cls.MAX_TRADING_FEE_RATE*100}%")
+            if not (0 <= self.TRADING_FEE_RATE <= self.MAX_TRADING_FEE_RATE):
+                errors.append(f"TRADING_FEE_RATE must be between 0% and {self.MAX_TRADING_FEE_RATE*100}%")
             
-            if not (0 <= cls.SLIPPAGE_RATE <= cls.MAX_SLIPPAGE_RATE):
-                errors.append(f"SLIPPAGE_RATE must be between 0% and {cls.MAX_SLIPPAGE_RATE*100}%")
+            if not (0 <= self.SLIPPAGE_RATE <= self.MAX_SLIPPAGE_RATE):
+                errors.append(f"SLIPPAGE_RATE must be between 0% and {self.MAX_SLIPPAGE_RATE*100}%")
             
-            if cls.MIN_PROFIT_THRESHOLD < 0 or cls.MIN_PROFIT_THRESHOLD > 0.1:
+            if self.MIN_PROFIT_THRESHOLD < 0 or self.MIN_PROFIT_THRESHOLD > 0.1:
                 errors.append("MIN_PROFIT_THRESHOLD must be between 0% and 10%")
             
             # Validate port
-            if not (1024 <= cls.STREAMLIT_PORT <= 65535):
+            if not (1024 <= self.STREAMLIT_PORT <= 65535):
                 errors.append("STREAMLIT_PORT must be between 1024 and 65535")
             
             # Validate file paths
-            if not PROJECT_ROOT.exists():
+            if not os.path.isdir(_PROJECT_ROOT_STR):
                 errors.append(f"Project root directory does not exist: {PROJECT_ROOT}")
             
             if errors:
@@ -104,14 +186,20 @@ class Config:
                 raise ConfigValidationError(error_msg)
             
             logger.info("✅ Configuration validation passed")
+            if fingerprint is not None:
+                try:
+                    VALIDATION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+                    VALIDATION_CACHE_FILE.write_text(fingerprint)
+                except OSError:
+                    pass  # Cache is best-effort (e.g. read-only home)
             return True
             
         except Exception as e:
             logger.error(f"Configuration validation error: {e}")
             raise ConfigValidationError(f"Configuration validation failed: {e}")
     
-    @classmethod
-    def sanitize_symbol(cls, symbol: str) -> str:
+    @staticmethod
+    def sanitize_symbol(symbol: str) -> str:
         """Sanitize trading symbol"""
         if not symbol or not isinstance(symbol, str):
             raise ConfigValidationError("Trading symbol must be a non-empty string")
@@ -129,18 +217,15 @@ class Config:
         
         return symbol
     
-    @classmethod
-    def ensure_directories(cls):
+    def ensure_directories(self):
         """Create necessary directories if they don't exist"""
         # Ensure parent directories exist for all file paths
-        for attr_name in dir(cls):
-            if attr_name.endswith('_FILE') or attr_name.endswith('_CSV') or attr_name.endswith('_PATH'):
-                file_path = getattr(cls, attr_name)
-                if isinstance(file_path, (str, Path)):
-                    Path(file_path).parent.mkdir(parents=True, exist_ok=True)
-    
-    @classmethod
-    def get_relative_path(cls, file_path):
+        for attr_name in _PATH_ATTRS:
+            file_path = getattr(self, attr_name)
+            if isinstance(file_path, (str, Path)):
+                Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    
+    def get_relative_path(self, file_path):
         """Convert absolute path to relative path from project root"""
         if isinstance(file_path, str):
             file_path = Path(file_path)
@@ -151,23 +236,76 @@ class Config:
             # If path is not relative to project root, return as is
             return file_path
 
-# Initialize directories and validate configuration on import
-Config.ensure_directories()
-
-# Only validate in production, not during testing
-if os.getenv('TRADING_ENV') != 'test':
-    try:
-        Config.validate_config()
-    except ConfigValidationError as e:
-        logging.warning(f"Configuration validation failed: {e}")
-        # Don't raise in import to allow partial functionality
-
-# Export commonly used paths as strings for backward compatibility
-DATABASE_PATH = str(Config.DATABASE_PATH)
-BOT_STATE_FILE = str(Config.BOT_STATE_FILE)
-LIVE_BOT_STATE_FILE = str(Config.LIVE_BOT_STATE_FILE)
-DEFAULT_CSV_DATA = str(Config.DEFAULT_CSV_DATA)
-EQUITY_CURVE_CSV = str(Config.EQUITY_CURVE_CSV)
-TRADE_HISTORY_CSV = str(Config.TRADE_HISTORY_CSV)
-LOG_FILE = str(Config.LOG_FILE)
-DASHBOARD_SUMMARY = str(Config.DASHBOARD_SUMMARY) 
\ No newline at end of file
+# File-path settings (used by ensure_directories)
+_PATH_ATTRS = tuple(f.name for f in fields(_Settings) if f.name.endswith(('_FILE', '_CSV', '_PATH')))
+
+def _build_config() -> _Settings:
+    """Read the environment once and freeze it into a _Settings instance"""
+    return _Settings(
+        DATABASE_PATH=_env_str('DATABASE_PATH', PROJECT_ROOT / "trading_dashboard.db"),
+        BOT_STATE_FILE=_env_str('BOT_STATE_FILE', PROJECT_ROOT / "bot_state.json"),
+        LIVE_BOT_STATE_FILE=_env_str('LIVE_BOT_STATE_FILE', PROJECT_ROOT / "live_bot_state.json"),
+        DEFAULT_CSV_DATA=_env_str('DEFAULT_CSV_DATA', PROJECT_ROOT / "btc_4h_2022_2025_clean.csv"),
+        EQUITY_CURVE_CSV=_env_str('EQUITY_CURVE_CSV', PROJECT_ROOT / "equity_curve.csv"),
+        TRADE_HISTORY_CSV=_env_str('TRADE_HISTORY_CSV', PROJECT_ROOT / "trade_history.csv"),
+        LOG_FILE=_env_str('LOG_FILE', PROJECT_ROOT / "trading_bot.log"),
+        DASHBOARD_SUMMARY=_env_str('DASHBOARD_SUMMARY', PROJECT_ROOT / "dashboard_summary.json"),
+        OHLCV_CACHE_DIR=_env_str('OHLCV_CACHE_DIR', PROJECT_ROOT / "ohlcv_cache"),
+        INITIAL_CAPITAL=_env_float('INITIAL_CAPITAL', 4000),
+        POSITION_SIZE_PCT=_env_float('POSITION_SIZE_PCT', 0.015),
+        TRADING_FEE_RATE=_env_float('TRADING_FEE_RATE', 0.001),
+        SLIPPAGE_RATE=_env_float('SLIPPAGE_RATE', 0.0005),
+        MIN_PROFIT_THRESHOLD=_env_float('MIN_PROFIT_THRESHOLD', 0.005),
+        EXCHANGE_NAME=_env_str('EXCHANGE_NAME', 'binance'),  # Default to binance
+        BYBIT_TESTNET=_env_bool('BYBIT_TESTNET', 'true'),
+        BINANCE_TESTNET=_env_bool('BINANCE_TESTNET', 'true'),
+        STREAMLIT_PORT=_env_int('PORT', 8501),
+        STREAMLIT_HOST=_env_str('STREAMLIT_HOST', '0.0.0.0'),
+    )
+
+Config = _build_config()
+
+# Directory creation and validation are deferred so importing Config or
+# ConfigValidationError alone costs no syscalls. They run when a path export
+# is first read (module __getattr__ below); entry points that only use
+# Config call ensure_initialized() themselves
+_initialized = False
+
+def ensure_initialized():
+    """Create directories for the configured paths and validate settings, once"""
+    global _initialized
+    if _initialized:
+        return
+    _initialized = True
+    
+    Config.ensure_directories()
+    
+    # Only validate in production, not during testing
+    if os.getenv('TRADING_ENV') != 'test':
+        try:
+            Config.validate_config(use_cache=True)
+        except ConfigValidationError as e:
+            logging.warning(f"Configuration validation failed: {e}")
+            # Don't raise in import to allow partial functionality
+
+# Export commonly used settings as module-level names
+INITIAL_CAPITAL = Config.INITIAL_CAPITAL
+POSITION_SIZE_PCT = Config.POSITION_SIZE_PCT
+TRADING_FEE_RATE = Config.TRADING_FEE_RATE
+SLIPPAGE_RATE = Config.SLIPPAGE_RATE
+MIN_PROFIT_THRESHOLD = Config.MIN_PROFIT_THRESHOLD
+
+# Commonly used paths, exported as strings for backward compatibility
+_LAZY_PATHS = (
+    'DATABASE_PATH', 'BOT_STATE_FILE', 'LIVE_BOT_STATE_FILE', 'DEFAULT_CSV_DATA',
+    'EQUITY_CURVE_CSV', 'TRADE_HISTORY_CSV', 'LOG_FILE', 'DASHBOARD_SUMMARY',
+    'OHLCV_CACHE_DIR',
+)
+
+def __getattr__(name):
+    if name in _LAZY_PATHS:
+        ensure_initialized()
+        value = str(getattr(Config, name))
+        globals()[name] = value  # Later lookups skip this hook
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
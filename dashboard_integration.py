@@ -2,8 +2,7 @@
 Dashboard Integration Helper
 Shows how to integrate dashboard logging into your existing trading bot
 """
-from enhanced_state_manager import DashboardStateManager
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 
 class DashboardIntegration:
@@ -11,9 +10,17 @@ class DashboardIntegration:
     Helper class to integrate dashboard logging into your existing trading bot
     """
     def __init__(self):
-        self.dashboard_state = DashboardStateManager()
+        self._dashboard_state = None
         print("✅ Dashboard integration initialized")
     
+    @property
+    def dashboard_state(self):
+        """DashboardStateManager, created (and its database opened) on first use"""
+        if self._dashboard_state is None:
+            from enhanced_state_manager import DashboardStateManager
+            self._dashboard_state = DashboardStateManager()
+        return self._dashboard_state
+    
     def integrate_with_live_bot(self, live_bot_instance):
         """
         Integrate dashboard logging with your LiveTradingBot
@@ -64,7 +71,8 @@ class DashboardIntegration:
         print("📊 Logging backtest results to dashboard...")
         
         try:
-            # Log individual trades from backtest
+            # Log individual trades from backtest, inserted as one batch
+            trade_batch = []
             for trade in trades_log:
                 trade_data = {
                     'timestamp': trade.get('timestamp', datetime.now().isoformat()),
@@ -79,42 +87,25 @@ class DashboardIntegration:
                     'entry_price': trade.get('price', 0) if trade.get('action') == 'BUY' else None,
                     'exit_price': trade.get('price', 0) if trade.get('action') == 'SELL' else None
                 }
-                self.dashboard_state.log_trade(trade_data)
+                trade_batch.append(trade_data)
+            self.dashboard_state.log_trade(trade_batch)
             
             # Log equity curve from backtest results
             if hasattr(backtest_results, 'index'):
-                for timestamp, row in backtest_results.iterrows():
-                    equity_data = {
-                        'timestamp': timestamp.isoformat(),
-                        'total_equity': row.get('TOTAL', 0),
-                        'ichimoku_equity': row.get('ICHIMOKU', 0),
-                        'reversal_equity': row.get('REVERSAL', 0),
-                        'open_positions': 0,  # Would need to track this in backtest
-                        'unrealized_pnl': 0,
-                        'daily_pnl': 0
-                    }
-                    
-                    # Insert directly into database for backtest data
-                    import sqlite3
-                    conn = sqlite3.connect(self.dashboard_state.db_path)
-                    cursor = conn.cursor()
-                    
-                    cursor.execute('''
-                        INSERT INTO equity_snapshots 
-                        (timestamp, total_equity, ichimoku_equity, reversal_equity, open_positions, unrealized_pnl, daily_pnl)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        equity_data['timestamp'],
-                        equity_data['total_equity'],
-                        equity_data['ichimoku_equity'],
-                        equity_data['reversal_equity'],
-                        equity_data['open_positions'],
-                        equity_data['unrealized_pnl'],
-                        equity_data['daily_pnl']
-                    ))
-                    
-                    conn.commit()
-                    conn.close()
+                # One transaction for the whole curve instead of a commit (and fsync) per bar
+                timestamps = backtest_results.index.map(lambda t: t.isoformat()).tolist()
+                values = backtest_results.reindex(
+                    columns=['TOTAL', 'ICHIMOKU', 'REVERSAL'], fill_value=0
+                ).to_numpy(dtype=float).tolist()
+                # open_positions / unrealized_pnl / daily_pnl would need to be tracked in backtest
+                rows = [
+                    (ts, total, ichimoku, reversal, 0, 0.0, 0.0)
+                    for ts, (total, ichimoku, reversal) in zip(timestamps, values)
+                ]
+                
+                # One multi-row insert through the manager's writer for backtest data
+                if rows:
+                    self.dashboard_state._write(self.dashboard_state._EQUITY_INSERT_SQL, rows)
             
             # Calculate and log performance metrics
             self.dashboard_state.log_performance_metrics()
@@ -130,75 +121,57 @@ class DashboardIntegration:
         """
         print("🧪 Creating sample data for dashboard testing...")
         
-        import random
-        from datetime import timedelta
+        import numpy as np
         
         base_time = datetime.now() - timedelta(days=30)
         base_price = 45000
         base_equity = 4000
         
+        # All random draws come from one Generator, in batches
+        rng = np.random.default_rng()
+        
         # Create sample trades
-        strategies = ['ICHIMOKU', 'REVERSAL']
-        actions = ['BUY', 'SELL']
+        n_trades = 50
+        strategies = np.array(['ICHIMOKU', 'REVERSAL'])
+        trade_strategies = strategies[rng.integers(0, 2, n_trades)].tolist()
+        is_sell = rng.integers(0, 2, n_trades).astype(bool)
         
-        for i in range(50):
-            trade_time = base_time + timedelta(hours=i*12)
-            strategy = random.choice(strategies)
-            action = random.choice(actions)
-            
-            # Simulate realistic trade data
-            price_change = random.uniform(-0.05, 0.05)
-            price = base_price * (1 + price_change)
-            quantity = random.uniform(0.01, 0.1)
-            
-            pnl = 0
-            if action == 'SELL':
-                pnl = random.uniform(-200, 500)  # Simulate win/loss
-            
+        # Simulate realistic trade data
+        prices = (base_price * (1 + rng.uniform(-0.05, 0.05, n_trades))).tolist()
+        quantities = rng.uniform(0.01, 0.1, n_trades).tolist()
+        pnls = np.where(is_sell, rng.uniform(-200, 500, n_trades), 0.0).tolist()  # Simulate win/loss
+        
+        for i in range(n_trades):
             trade_data = {
-                'timestamp': trade_time.isoformat(),
+                'timestamp': (base_time + timedelta(hours=i*12)).isoformat(),
                 'symbol': 'BTC/USDT',
-                'strategy': strategy,
-                'action': action,
-                'quantity': quantity,
-                'price': price,
-                'pnl': pnl,
-                'fee': abs(pnl) * 0.001,  # 0.1% fee
+                'strategy': trade_strategies[i],
+                'action': 'SELL' if is_sell[i] else 'BUY',
+                'quantity': quantities[i],
+                'price': prices[i],
+                'pnl': pnls[i],
+                'fee': abs(pnls[i]) * 0.001,  # 0.1% fee
                 'paper_traded': True
             }
             
             self.dashboard_state.log_trade(trade_data)
         
-        # Create sample equity snapshots
-        equity = base_equity
-        for i in range(30*24):  # 30 days, hourly snapshots
-            snapshot_time = base_time + timedelta(hours=i)
-            
-            # Simulate equity growth/decline
-            daily_change = random.uniform(-0.02, 0.03)
-            equity *= (1 + daily_change/24)  # Hourly change
-            
-            # Log equity snapshot directly
-            import sqlite3
-            conn = sqlite3.connect(self.dashboard_state.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO equity_snapshots 
-                (timestamp, total_equity, ichimoku_equity, reversal_equity, open_positions, unrealized_pnl, daily_pnl)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                snapshot_time.isoformat(),
-                equity,
-                equity * 0.9,  # 90% Ichimoku
-                equity * 0.1,  # 10% Reversal
-                random.randint(0, 3),  # Random open positions
-                random.uniform(-100, 200),  # Unrealized P&L
-                random.uniform(-50, 100)   # Daily P&L
-            ))
-            
-            conn.commit()
-            conn.close()
+        # Create sample equity snapshots: 30 days, hourly
+        n_snapshots = 30*24
+        daily_change = rng.uniform(-0.02, 0.03, n_snapshots)
+        equity = base_equity * np.cumprod(1 + daily_change/24)  # Hourly change
+        snapshot_rows = list(zip(
+            [(base_time + timedelta(hours=i)).isoformat() for i in range(n_snapshots)],
+            equity.tolist(),
+            (equity * 0.9).tolist(),  # 90% Ichimoku
+            (equity * 0.1).tolist(),  # 10% Reversal
+            rng.integers(0, 4, n_snapshots).tolist(),  # Random open positions
+            rng.uniform(-100, 200, n_snapshots).tolist(),  # Unrealized P&L
+            rng.uniform(-50, 100, n_snapshots).tolist()   # Daily P&L
+        ))
+        
+        # Log equity snapshots directly, as one batch through the manager's writer
+        self.dashboard_state._write(self.dashboard_state._EQUITY_INSERT_SQL, snapshot_rows)
         
         # Log performance metrics
         self.dashboard_state.log_performance_metrics()
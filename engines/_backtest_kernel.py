@@ -0,0 +1,206 @@
+"""
+Compiled per-bar state machine for the back-test engine.
+Pure scalar arithmetic over ndarrays so Numba can lower it to native code;
+all I/O (printing, paper trading) stays in engines/backtest.py.
+The compiled kernel touches no Python objects, so it runs without the GIL
+and does not stall other threads (e.g. dashboard writers) while it loops.
+"""
+from __future__ import annotations
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional: without it the kernel runs as plain Python (same results, slower)
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+    prange = range
+
+BUY = 0
+SELL = 1
+
+@njit(cache=True, nogil=True, parallel=True)
+def run_kernel(close, atr, entry_masks, exit_masks, stop_distances, target_distances,
+               start_cash, initial_capital, risk_frac, enable_realistic_costs,
+               trading_fee_rate, slippage_rate, min_profit_threshold):
+    """
+    Simulate K long-only strategies over N bars.
+
+    close, atr:                       (N,) float64
+    entry_masks, exit_masks:          (K, N) bool
+    stop_distances, target_distances: (K, N) float64, NaN where unused
+    start_cash:                       (K,) float64 cash per strategy slice
+
+    Returns (equity, trade_bar, trade_strat, trade_action, trade_price,
+    trade_qty, trade_pnl, trade_fee); equity is (N, K+1) with TOTAL last,
+    the trade arrays are trimmed to the number of trades made and ordered
+    by bar, then by strategy.
+    """
+    k, n = entry_masks.shape
+    # Stored strategy-major so each thread writes one contiguous row (no
+    # cache lines shared between threads); returned transposed as (N, K+1)
+    equity = np.empty((k + 1, n))
+
+    # Per-strategy trade buffers, preallocated to an exact upper bound: at most
+    # one trade per bar, and every BUY needs an entry bar while every SELL
+    # closes a BUY, so a strategy trades at most 2 * (its entry bars) times
+    cap = 0
+    for j in range(k):
+        entries = 0
+        for i in range(n):
+            if entry_masks[j, i]:
+                entries += 1
+        cap = max(cap, min(n, 2 * entries))
+    buf_bar = np.empty((k, cap), dtype=np.int64)
+    buf_action = np.empty((k, cap), dtype=np.int8)
+    buf_price = np.empty((k, cap))
+    buf_qty = np.empty((k, cap))
+    buf_pnl = np.empty((k, cap))
+    buf_fee = np.empty((k, cap))
+    buf_len = np.zeros(k, dtype=np.int64)
+
+    # Strategies share no state (each trades its own cash slice), so every
+    # strategy walks the bars independently on its own thread
+    for j in prange(k):
+        cash = start_cash[j]
+        qty = 0.0
+        entry = np.nan
+        t = 0
+
+        for i in range(n):
+            price = close[i]
+            if np.isnan(price):
+                # No trading on a missing close; carry the previous mark forward
+                if i > 0:
+                    equity[j, i] = equity[j, i - 1]
+                else:
+                    equity[j, i] = cash
+                continue
+
+            # --- OPEN LOGIC ---
+            if qty == 0.0 and entry_masks[j, i]:
+                if atr[i] > 0.0:
+                    units = (cash * risk_frac) / atr[i]
+
+                    # Slippage: buy at a higher price
+                    if enable_realistic_costs:
+                        execution_price = price * (1 + slippage_rate)
+                    else:
+                        execution_price = price
+
+                    # Check affordability including fees
+                    total_cost = units * execution_price
+                    if enable_realistic_costs:
+                        fee = total_cost * trading_fee_rate
+                        total_cost += fee
+                    else:
+                        fee = 0.0
+
+                    if total_cost > cash:
+                        # Recalculate units to fit available cash
+                        if enable_realistic_costs:
+                            units = cash / (execution_price * (1 + trading_fee_rate))
+                            fee = units * execution_price * trading_fee_rate
+                        else:
+                            units = cash / execution_price
+                            fee = 0.0
+
+                    if units > 0.0:
+                        qty = units
+                        cash -= units * execution_price + fee
+                        entry = execution_price
+
+                        buf_bar[j, t] = i
+                        buf_action[j, t] = BUY
+                        buf_price[j, t] = execution_price
+                        buf_qty[j, t] = units
+                        buf_pnl[j, t] = 0.0
+                        buf_fee[j, t] = fee
+                        t += 1
+
+            # --- CLOSE LOGIC ---
+            elif qty > 0.0 and (exit_masks[j, i]
+                                or price <= entry - stop_distances[j, i]
+                                or price >= entry + target_distances[j, i]):
+                sell_units = qty
+
+                # Slippage: sell at a lower price
+                if enable_realistic_costs:
+                    execution_price = price * (1 - slippage_rate)
+                else:
+                    execution_price = price
+
+                # Only exit once the minimum profit is reached (when realistic costs enabled)
+                profit_pct = (execution_price - entry) / entry
+                if not (enable_realistic_costs and profit_pct < min_profit_threshold):
+                    gross_proceeds = sell_units * execution_price
+                    if enable_realistic_costs:
+                        fee = gross_proceeds * trading_fee_rate
+                    else:
+                        fee = 0.0
+
+                    net_proceeds = gross_proceeds - fee
+                    pnl = net_proceeds - (sell_units * entry)
+
+                    cash += net_proceeds
+
+                    buf_bar[j, t] = i
+                    buf_action[j, t] = SELL
+                    buf_price[j, t] = execution_price
+                    buf_qty[j, t] = sell_units
+                    buf_pnl[j, t] = pnl
+                    buf_fee[j, t] = fee
+                    t += 1
+
+                    qty = 0.0
+                    entry = np.nan
+
+            # --- Mark to Market ---
+            equity[j, i] = cash + qty * price
+
+        buf_len[j] = t
+
+    # Portfolio total: add whole (contiguous) strategy rows in strategy order.
+    # A missing close carries every strategy's mark forward, so the sum
+    # carries the previous total too; only leading missing closes, before
+    # any mark exists, report the initial capital
+    total = equity[k]
+    total[:] = 0.0
+    for j in range(k):
+        total += equity[j]
+    i = 0
+    while i < n and np.isnan(close[i]):
+        total[i] = initial_capital
+        i += 1
+
+    # Merge the per-strategy buffers into one log ordered by bar, then strategy
+    n_trades = 0
+    for j in range(k):
+        n_trades += buf_len[j]
+    trade_bar = np.empty(n_trades, dtype=np.int64)
+    trade_strat = np.empty(n_trades, dtype=np.int64)
+    trade_action = np.empty(n_trades, dtype=np.int8)
+    trade_price = np.empty(n_trades)
+    trade_qty = np.empty(n_trades)
+    trade_pnl = np.empty(n_trades)
+    trade_fee = np.empty(n_trades)
+    cursor = np.zeros(k, dtype=np.int64)
+    for out in range(n_trades):
+        best = -1
+        for j in range(k):
+            if cursor[j] < buf_len[j] and (best < 0 or buf_bar[j, cursor[j]] < buf_bar[best, cursor[best]]):
+                best = j
+        c = cursor[best]
+        trade_bar[out] = buf_bar[best, c]
+        trade_strat[out] = best
+        trade_action[out] = buf_action[best, c]
+        trade_price[out] = buf_price[best, c]
+        trade_qty[out] = buf_qty[best, c]
+        trade_pnl[out] = buf_pnl[best, c]
+        trade_fee[out] = buf_fee[best, c]
+        cursor[best] = c + 1
+
+    return (equity.T, trade_bar, trade_strat, trade_action,
+            trade_price, trade_qty, trade_pnl, trade_fee)
@@ -4,10 +4,13 @@ Assumes long‑only strategies for now.
 Enhanced with realistic trading costs and slippage.
 """
 from __future__ import annotations
-from typing import List, Dict, Any, Optional
+import sys
+from typing import List, Any, Optional
 import pandas as pd
 import numpy as np
 
+from ._backtest_kernel import run_kernel, BUY
+
 # Import the execute_trade function
 # Assuming exchange_handler.py is in the same parent directory or PYTHONPATH
 try:
@@ -18,6 +21,17 @@ except ImportError:
         print("WARN: exchange_handler.execute_trade not found, paper trading disabled.")
         return None
 
+RISK_PER_TRADE = 0.015  # Increased from 0.0025 to 0.015 (1.5% of slice cash risked per ATR unit)
+
+def _last_valid(equity_arr: np.ndarray) -> np.ndarray:
+    """Last non-NaN value of each column (NaN where a column has none)."""
+    n, m = equity_arr.shape
+    if n == 0:
+        return np.full(m, np.nan)
+    valid = ~np.isnan(equity_arr)
+    last = n - 1 - np.argmax(valid[::-1], axis=0)
+    return np.where(valid.any(axis=0), equity_arr[last, np.arange(m)], np.nan)
+
 def run(
     df: pd.DataFrame, 
     strategies: List, 
@@ -30,7 +44,8 @@ def run(
     trading_fee_rate: float = 0.001,  # 0.1% per trade (Bybit standard)
     slippage_rate: float = 0.0005,    # 0.05% slippage
     min_profit_threshold: float = 0.01,  # Minimum 1% profit to close position
-    enable_realistic_costs: bool = True
+    enable_realistic_costs: bool = True,
+    verbose: bool = False
 ):
     """
     Enhanced backtest with realistic trading costs.
@@ -40,18 +55,24 @@ def run(
         slippage_rate: Slippage rate per trade (0.0005 = 0.05%)
         min_profit_threshold: Minimum profit % to close position (0.01 = 1%)
         enable_realistic_costs: Whether to apply fees and slippage
+        verbose: Print every simulated trade (default prints only the trade count)
     """
-    # precompute indicators
+    # precompute indicators, then evaluate every strategy's signals once up
+    # front; the simulation only indexes the resulting boolean arrays
     for s in strategies:
-        s.precompute_indicators(df)
+        s.attach_indicators(df)  # Free when the caller already computed them on df
+    signals = [s.compute_signals(df) for s in strategies]
 
-    cash   : Dict[str, float] = {s.slice: initial_capital*s.allocation for s in strategies}
-    qty    : Dict[str, float] = {s.slice: 0.0 for s in strategies}
-    entry  : Dict[str, float] = {s.slice: np.nan for s in strategies}
-    trades_log: List[Dict[str, Any]] = []
-    total_fees_paid: float = 0.0
-
-    equity = pd.DataFrame(index=df.index, columns=[s.slice for s in strategies] + ["TOTAL"], dtype=float)
+    close = df["close"].to_numpy(dtype=np.float64)
+    atr = df["ATR"].to_numpy(dtype=np.float64)
+    entry_masks = np.vstack([entry for entry, _ in signals])
+    exit_masks = np.vstack([exit_ for _, exit_ in signals])
+    stop_distances = np.vstack([s.stop_distance for s in strategies]).astype(np.float64)
+    target_distances = np.vstack([s.target_distance for s in strategies]).astype(np.float64)
+    start_cash = np.array([initial_capital*s.allocation for s in strategies], dtype=np.float64)
+    # Strategy state lives in K-length arrays indexed by position; names are
+    # only needed to label the equity columns and the trade log
+    slices = [s.slice for s in strategies]
 
     print(f"\nStarting Enhanced Backtest Run...")
     print(f"Paper Trading Enabled: {enable_paper_trading}")
@@ -68,190 +89,75 @@ def run(
         print("WARN: Paper trading enabled but Exchange symbol is not set. Disabling paper trading for this run.") # Updated message
         enable_paper_trading = False
 
-    for ts, row in df.iterrows():
-        # Check if essential price data is available
-        if pd.isna(row.close):
-            # print(f"WARN: Skipping timestamp {ts} due to missing close price.")
-            # Need to handle equity calculation if we skip
-            # For now, just forward fill the equity for skipped rows based on the last valid value
-            if ts != df.index[0]:
-                equity.loc[ts] = equity.loc[df.index[df.index.get_loc(ts) - 1]]
-            else:
-                 # Set initial equity if the very first row has NaNs we can't process
-                 for s in strategies:
-                     equity.at[ts, s.slice] = cash[s.slice]
-                 equity.at[ts, "TOTAL"] = initial_capital
-            continue # Skip this row for trading logic
-            
-        price = row.close
-
-        for s in strategies:
-            # --- OPEN LOGIC --- 
-            if qty[s.slice] == 0 and s.entry_signal(ts, df):
-                if pd.notna(row.ATR) and row.ATR > 0:
-                    risk = row.ATR
-                    # Calculate desired units based on strategy's simulated cash
-                    units = (cash[s.slice] * 0.015) / risk  # Increased from 0.0025 to 0.015 (1.5% risk per trade)
-                    
-                    # Apply slippage to buy price (buy at higher price)
-                    if enable_realistic_costs:
-                        execution_price = price * (1 + slippage_rate)
-                    else:
-                        execution_price = price
-                    
-                    # Check affordability including fees
-                    total_cost = units * execution_price
-                    if enable_realistic_costs:
-                        fee = total_cost * trading_fee_rate
-                        total_cost += fee
-                    else:
-                        fee = 0
-                    
-                    if total_cost > cash[s.slice]:
-                        # Recalculate units to fit available cash
-                        if enable_realistic_costs:
-                            units = cash[s.slice] / (execution_price * (1 + trading_fee_rate))
-                            fee = units * execution_price * trading_fee_rate
-                        else:
-                            units = cash[s.slice] / execution_price
-                            fee = 0
-                    
-                    # Ensure units > 0 after checks
-                    if units > 0:
-                        # --- Attempt Paper Trade (BUY) ---
-                        paper_trade_success = False
-                        if enable_paper_trading:
-                            print(f"--> PAPER TRADE: Attempting BUY {units:.4f} {exchange_symbol} for strategy {s.slice} at ~{execution_price:.2f}") # Use exchange_symbol
-                            order_receipt = execute_trade(
-                                exchange_obj=exchange_obj, 
-                                symbol=exchange_symbol, # Use exchange_symbol
-                                order_type='market', 
-                                side='buy', 
-                                amount_base_currency_to_trade=units,
-                                current_price=price,
-                                sim_timestamp=ts
-                            )
-                            if order_receipt:
-                                # TODO: Potentially adjust 'units' based on actual filled amount from order_receipt if needed
-                                print(f"--> PAPER TRADE: BUY Order successful: {order_receipt.get('id')}")
-                                paper_trade_success = True 
-                            else:
-                                print(f"--> PAPER TRADE: BUY Order FAILED for strategy {s.slice}.")
-                        # --------------------------------
-                        
-                        # Update Simulation State (only if paper trade succeeded or paper trading is disabled)
-                        # If paper trading fails, maybe we shouldn't update the sim state?
-                        # For now, let's update the sim state regardless, to keep the backtest consistent.
-                        # A more advanced system could handle this differently (e.g., skip sim update if paper fails).
-                        #if paper_trade_success or not enable_paper_trading:
-                        qty[s.slice] = units
-                        cash[s.slice] -= units * execution_price + fee
-                        entry[s.slice] = execution_price
-                        total_fees_paid += fee
-                        trades_log.append({
-                            "timestamp": ts, "strategy": s.slice, "action": "BUY",
-                            "price": execution_price, "quantity": units, "pnl": 0, "fee": fee, "paper_traded": paper_trade_success
-                        })
-                        #else: 
-                        #    print(f"--> SIMULATION: Did not update simulation state for {s.slice} BUY due to paper trade failure.")
-
-            # --- CLOSE LOGIC ---            
-            elif qty[s.slice] > 0 and s.exit_signal(ts, df, entry[s.slice]):
-                sell_units = qty[s.slice] # Simulating closing the full position
-                
-                # Apply slippage to sell price (sell at lower price)
-                if enable_realistic_costs:
-                    execution_price = price * (1 - slippage_rate)
-                else:
-                    execution_price = price
-                
-                # Calculate profit percentage before fees
-                profit_pct = (execution_price - entry[s.slice]) / entry[s.slice]
-                
-                # Only execute if profit exceeds minimum threshold (when realistic costs enabled)
-                if enable_realistic_costs and profit_pct < min_profit_threshold:
-                    continue  # Skip this exit signal
-                
-                # Calculate fees
-                gross_proceeds = sell_units * execution_price
-                if enable_realistic_costs:
-                    fee = gross_proceeds * trading_fee_rate
-                else:
-                    fee = 0
-                
-                net_proceeds = gross_proceeds - fee
-                pnl = net_proceeds - (sell_units * entry[s.slice])
-                
-                # --- Attempt Paper Trade (SELL) ---
-                paper_trade_success = False
-                if enable_paper_trading:
-                    print(f"--> PAPER TRADE: Attempting SELL {sell_units:.4f} {exchange_symbol} for strategy {s.slice} at ~{execution_price:.2f}") # Use exchange_symbol
-                    order_receipt = execute_trade(
-                        exchange_obj=exchange_obj, 
-                        symbol=exchange_symbol, # Use exchange_symbol
-                        order_type='market', 
-                        side='sell', 
-                        amount_base_currency_to_trade=sell_units,
-                        current_price=price,
-                        sim_timestamp=ts
-                    )
-                    if order_receipt:
-                        print(f"--> PAPER TRADE: SELL Order successful: {order_receipt.get('id')}")
-                        paper_trade_success = True
-                    else:
-                        print(f"--> PAPER TRADE: SELL Order FAILED for strategy {s.slice}.")
-                # --------------------------------
-                
-                # Update Simulation State (similar logic as BUY)
-                #if paper_trade_success or not enable_paper_trading:
-                cash[s.slice] += net_proceeds
-                total_fees_paid += fee
-                trades_log.append({
-                    "timestamp": ts, "strategy": s.slice, "action": "SELL",
-                    "price": execution_price, "quantity": sell_units, "pnl": pnl, "fee": fee, "paper_traded": paper_trade_success
-                })
-                qty[s.slice] = 0
-                entry[s.slice] = np.nan
-                #else:
-                #    print(f"--> SIMULATION: Did not update simulation state for {s.slice} SELL due to paper trade failure.")
+    # --- Simulation (compiled kernel) ---
+    (equity_arr, trade_bar, trade_strat, trade_action,
+     trade_price, trade_qty, trade_pnl, trade_fee) = run_kernel(
+        close, atr, entry_masks, exit_masks, stop_distances, target_distances,
+        start_cash, float(initial_capital), RISK_PER_TRADE, bool(enable_realistic_costs),
+        float(trading_fee_rate), float(slippage_rate), float(min_profit_threshold)
+    )
+    equity = pd.DataFrame(equity_arr, index=df.index, columns=slices + ["TOTAL"])
 
-        # --- Mark to Market (Simulation) ---
-        for s in strategies:
-            equity.at[ts, s.slice] = cash[s.slice] + qty[s.slice]*price
-        current_total_equity = equity.loc[ts, [s.slice for s in strategies]].sum()
-        if pd.isna(current_total_equity) and ts == df.index[0]:
-            equity.at[ts, "TOTAL"] = initial_capital
-        elif pd.notna(current_total_equity):
-            equity.at[ts, "TOTAL"] = current_total_equity
-        else: # If still NaN after first row, forward fill from last known total
-            if ts != df.index[0]:
-                equity.at[ts, "TOTAL"] = equity.at[df.index[df.index.get_loc(ts) - 1], "TOTAL"]
-            else: # Very first row was NaN and remains NaN
-                 equity.at[ts, "TOTAL"] = initial_capital
+    # --- Trade log + paper trading replay ---
+    # The trade log stays columnar (structure of arrays, one entry per trade)
+    # as returned by the kernel; only the paper-trade outcome is added here.
+    # The simulation never depends on that outcome, so orders are sent after
+    # the kernel in the same sequence the simulation produced them.
+    n_trades = len(trade_bar)
+    trade_ts = df.index[trade_bar]
+    trade_side = np.where(trade_action == BUY, "BUY", "SELL")
+    paper_traded = np.zeros(n_trades, dtype=bool)
+    if enable_paper_trading:
+        for i in range(n_trades):
+            side = str(trade_side[i])
+            slice_name = slices[trade_strat[i]]
+            quantity = float(trade_qty[i])
+            print(f"--> PAPER TRADE: Attempting {side} {quantity:.4f} {exchange_symbol} for strategy {slice_name} at ~{trade_price[i]:.2f}") # Use exchange_symbol
+            order_receipt = execute_trade(
+                exchange_obj=exchange_obj, 
+                symbol=exchange_symbol, # Use exchange_symbol
+                order_type='market', 
+                side=side.lower(), 
+                amount_base_currency_to_trade=quantity,
+                current_price=close[trade_bar[i]],
+                sim_timestamp=trade_ts[i]
+            )
+            if order_receipt:
+                # TODO: Potentially adjust 'units' based on actual filled amount from order_receipt if needed
+                print(f"--> PAPER TRADE: {side} Order successful: {order_receipt.get('id')}")
+                paper_traded[i] = True
+            else:
+                print(f"--> PAPER TRADE: {side} Order FAILED for strategy {slice_name}.")
+    total_fees_paid: float = sum(trade_fee.tolist())
 
     # --- Enhanced Reporting --- 
     print("\n--- Trade Log (Simulation with Costs) ---")
-    if not trades_log:
+    if n_trades == 0:
         print("No simulated trades were made.")
+    elif not verbose:
+        print(f"{n_trades} simulated trades (per-trade listing disabled, verbose=False)")
     else:
-        for trade in trades_log:
-             paper_status = "Paper:Yes" if trade.get("paper_traded") else "Paper:No/Failed"
-             fee_info = f", Fee: {trade.get('fee', 0):.2f}" if enable_realistic_costs else ""
-             print(f"{trade['timestamp']} - {trade['strategy']:<10} - {trade['action']:<4} - "
-                   f"Price: {trade['price']:.2f}, Qty: {trade['quantity']:.4f}, "
-                   f"PnL: {trade['pnl']:.2f}{fee_info} - {paper_status}")
+        # Format every line first, then hand stdout one write instead of one print per trade
+        lines = []
+        for ts, strat, side, price, quantity, pnl, fee, paper in zip(
+                trade_ts, trade_strat.tolist(), trade_side.tolist(), trade_price.tolist(),
+                trade_qty.tolist(), trade_pnl.tolist(), trade_fee.tolist(), paper_traded.tolist()):
+             paper_status = "Paper:Yes" if paper else "Paper:No/Failed"
+             fee_info = f", Fee: {fee:.2f}" if enable_realistic_costs else ""
+             lines.append(f"{ts} - {slices[strat]:<10} - {side:<4} - "
+                          f"Price: {price:.2f}, Qty: {quantity:.4f}, "
+                          f"PnL: {pnl:.2f}{fee_info} - {paper_status}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     print("\n--- Summary (Simulation with Realistic Costs) ---")
     print(f"Initial Capital: {initial_capital:.2f}")
     
-    final_total_equity = equity["TOTAL"].iloc[-1]
-    if pd.isna(final_total_equity):
-        # If the last equity value is NaN, try finding the last valid one
-        last_valid_idx = equity["TOTAL"].last_valid_index()
-        if last_valid_idx is not None:
-            final_total_equity = equity.loc[last_valid_idx, "TOTAL"]
-        else: # If no valid equity value found at all, use initial capital
-            final_total_equity = initial_capital
+    # Final values come straight from the kernel's (N, K+1) array rather than
+    # label lookups on the wrapped DataFrame; TOTAL is the last column
+    final_equity = _last_valid(equity_arr)
+    final_total_equity = final_equity[-1]
+    if np.isnan(final_total_equity): # If no valid equity value found at all, use initial capital
+        final_total_equity = initial_capital
         
     print(f"Final Total Equity: {final_total_equity:.2f}")
     total_pnl = final_total_equity - initial_capital
@@ -262,23 +168,29 @@ def run(
         print(f"Return %: {(total_pnl/initial_capital)*100:.2f}%")
     
     print("\n--- Strategy Breakdown (Simulation) ---")
+    # Per-strategy totals straight from the trade columns; bincount adds in
+    # trade order, so the sums match a sequential Python loop
+    k = len(slices)
+    is_sell = trade_action != BUY
+    strategy_pnls = np.bincount(trade_strat, weights=np.where(is_sell, trade_pnl, 0.0), minlength=k)
+    strategy_fee_totals = np.bincount(trade_strat, weights=trade_fee, minlength=k)
+    strategy_entries = np.bincount(trade_strat[~is_sell], minlength=k) # count entries
+
     total_trades_count = 0
-    for s in strategies:
-        strategy_trades = [t for t in trades_log if t["strategy"] == s.slice]
-        strategy_pnl = sum(t["pnl"] for t in strategy_trades if t["action"] == "SELL")
-        strategy_fees = sum(t.get("fee", 0) for t in strategy_trades)
-        num_strategy_trades = len([t for t in strategy_trades if t["action"] == "BUY"]) # count entries
+    for j, slice_name in enumerate(slices):
+        strategy_pnl = strategy_pnls[j]
+        strategy_fees = strategy_fee_totals[j]
+        num_strategy_trades = int(strategy_entries[j])
         total_trades_count += num_strategy_trades
         
-        initial_strategy_capital = initial_capital * s.allocation
-        # Find the last valid equity value for the strategy slice
-        last_valid_strat_idx = equity[s.slice].last_valid_index()
-        if last_valid_strat_idx is not None:
-            final_strategy_equity = equity.loc[last_valid_strat_idx, s.slice]
-        else:
+        # Slice capital was computed once for the kernel
+        initial_strategy_capital = start_cash[j]
+        # Last valid equity value for the strategy slice
+        final_strategy_equity = final_equity[j]
+        if np.isnan(final_strategy_equity):
              final_strategy_equity = initial_strategy_capital # Default if no valid equity found
 
-        print(f"Strategy: {s.slice}")
+        print(f"Strategy: {slice_name}")
         print(f"  Initial Allocation: {initial_strategy_capital:.2f}")
         print(f"  Final Equity: {final_strategy_equity:.2f}")
         print(f"  P&L: {strategy_pnl:.2f}")
@@ -6,23 +6,228 @@ Provides SQLite-based logging for portfolio tracking
 import sqlite3
 import json
 import logging
-from datetime import datetime
-from pathlib import Path
+import operator
+import numpy as np
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from config import Config, DATABASE_PATH, BOT_STATE_FILE
-from state_manager import TradingStateManager, PositionManager
+from state_manager import TradingStateManager, PositionManager, _STOP_WRITER
 from strategy_constants import StrategyNames, get_strategy_db_name, validate_strategy_name
 
+# WAL journal (persisted in the database file): commits append to the log
+# instead of rewriting pages, and dashboard readers no longer block the bot
+DATABASE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;"
+    "PRAGMA journal_size_limit=6144000;"
+    "PRAGMA wal_autocheckpoint=1000;"
+)
+
+# Per-connection settings: under WAL, NORMAL sync only fsyncs at checkpoints
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;"
+    "PRAGMA temp_store=MEMORY;"
+    "PRAGMA cache_size=-16000;"
+    "PRAGMA mmap_size=268435456;"
+)
+
+# Background writer batching: at most this many queued writes per
+# transaction, collected for at most this many seconds
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_WAIT = 0.01
+# The writer refreshes the query planner's statistics every this many batches
+OPTIMIZE_EVERY_BATCHES = 1000
+
+# trades table columns in insert order, with the value used when a trade omits one
+# (a missing timestamp means now)
+TRADE_COLUMNS = ('timestamp', 'symbol', 'strategy', 'action', 'quantity', 'price',
+                 'pnl', 'fee', 'paper_traded', 'entry_price', 'exit_price')
+TRADE_DEFAULTS = (None, '', '', '', 0, 0, 0, 0, False, None, None)
+# Reads every column of a complete trade dict in a single C call
+_trade_values = operator.itemgetter(*TRADE_COLUMNS)
+
+# Multi-row INSERTs stay under SQLite's historical bound-parameter limit
+MAX_SQL_PARAMS = 999
+
+def _insert_rows(conn, sql, rows):
+    """
+    Insert rows with sql (an INSERT ... VALUES (...) statement) as multi-row
+    VALUES statements: one statement step per chunk instead of one per row
+    """
+    if len(rows) == 1:
+        conn.execute(sql, rows[0])
+        return
+    head, values = sql.rsplit('VALUES', 1)
+    values = values.strip()
+    chunk = max(MAX_SQL_PARAMS // len(rows[0]), 1)
+    for start in range(0, len(rows), chunk):
+        batch = rows[start:start + chunk]
+        conn.execute(
+            f"{head}VALUES {','.join([values] * len(batch))}",
+            [value for row in batch for value in row]
+        )
+
+# Dashboard polls within this many seconds reuse the previous summary
+SUMMARY_TTL = 1.0
+
 class DashboardStateManager(TradingStateManager):
-    def __init__(self, state_file=None):
-        self.state_file = Path(state_file) if state_file else Path(BOT_STATE_FILE)
+    # Insert statements kept as single string objects: every call passes the
+    # identical SQL, so the connection's prepared-statement cache always hits
+    _TRADE_INSERT_SQL = '''
+        INSERT INTO trades
+        (timestamp, symbol, strategy, action, quantity, price, pnl, fee, paper_traded, entry_price, exit_price)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    _EQUITY_INSERT_SQL = '''
+        INSERT INTO equity_snapshots
+        (timestamp, total_equity, ichimoku_equity, reversal_equity, open_positions, unrealized_pnl, daily_pnl)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    _METRICS_INSERT_SQL = '''
+        INSERT INTO performance_metrics
+        (timestamp, total_trades, winning_trades, losing_trades, win_rate, profit_factor, max_drawdown, total_return)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    _HEALTH_INSERT_SQL = '''
+        INSERT INTO system_health
+        (timestamp, status, last_trade_time, api_connection, error_count)
+        VALUES (?, ?, (SELECT timestamp FROM trades ORDER BY timestamp DESC LIMIT 1), ?, ?)
+    '''
+    
+    def __init__(self, state_file=None, background_writes=False):
+        # The inherited save_state keeps its own writer thread and queue
+        super().__init__(state_file or BOT_STATE_FILE, background_writes)
         self.db_path = DATABASE_PATH
         
         self.logger = logging.getLogger(__name__)
+        # One long-lived connection per (thread, database path)
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        self._summary_cache = None  # (expiry, summary) from get_dashboard_summary
         self.init_database()
+        
+        # Optional single writer thread: log_* calls only queue their rows and
+        # the writer commits them in batches, so callers never wait on the
+        # database lock or on disk
+        self._db_lock = threading.RLock()
+        self._db_queue = None
+        self._db_writer = None
+        if background_writes:
+            self._db_queue = queue.Queue()
+            self._db_writer = threading.Thread(
+                target=self._db_writer_loop, args=(self._db_queue,),
+                name="dashboard-writer", daemon=True
+            )
+            self._db_writer.start()
+    
+    def _get_conn(self):
+        """
+        Return this thread's connection to the dashboard database, opening it
+        (with the write-friendly pragmas) on first use. Keyed on db_path so a
+        changed path gets its own connection.
+        """
+        conns = getattr(self._local, 'conns', None)
+        if conns is None:
+            conns = self._local.conns = {}
+        conn = conns.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.executescript(CONNECTION_PRAGMAS)
+            conns[self.db_path] = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        elif conn.in_transaction:
+            # Discard whatever a failed earlier call left uncommitted
+            conn.rollback()
+        return conn
+    
+    def _write(self, sql, rows):
+        """Insert rows with sql, via the writer thread when background writes are on"""
+        self._summary_cache = None  # Our own writes make the cached summary stale
+        with self._db_lock:
+            if self._db_queue is not None:
+                self._db_queue.put((sql, rows))
+                return
+        # The connection's context manager commits, or rolls back on error
+        with self._get_conn() as conn:
+            _insert_rows(conn, sql, rows)
+    
+    def _db_writer_loop(self, pending):
+        """Commit queued writes in batches, one transaction per batch"""
+        stop = False
+        batches_written = 0
+        while not stop:
+            items = [pending.get()]
+            deadline = time.monotonic() + WRITE_BATCH_WAIT
+            while len(items) < WRITE_BATCH_SIZE and items[-1] is not _STOP_WRITER:
+                try:
+                    items.append(pending.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            
+            stop = _STOP_WRITER in items
+            # Group rows per statement so each table gets one multi-row insert
+            batches = {}
+            for item in items:
+                if item is _STOP_WRITER:
+                    continue
+                try:
+                    sql, rows = item
+                except (TypeError, ValueError):
+                    self.logger.error("Dropping malformed dashboard write: %r", type(item))
+                    continue
+                batches.setdefault(sql, []).extend(rows)
+            if batches:
+                try:
+                    with self._get_conn() as conn:
+                        conn.execute('BEGIN IMMEDIATE')
+                        for sql, rows in batches.items():
+                            _insert_rows(conn, sql, rows)
+                    batches_written += 1
+                    if batches_written % OPTIMIZE_EVERY_BATCHES == 0:
+                        conn.execute('PRAGMA optimize')
+                except Exception as e:
+                    self.logger.error(f"Failed to write dashboard batch: {e}")
+            
+            for _ in items:
+                pending.task_done()
+    
+    def flush_db(self):
+        """Block until every queued database write has been committed"""
+        pending = self._db_queue
+        if pending is not None:
+            pending.join()
+    
+    def close(self):
+        """
+        Stop the state-file writer (see TradingStateManager.close), commit
+        queued database writes, stop their writer and close every pooled connection
+        """
+        super().close()
+        with self._db_lock:
+            pending, self._db_queue = self._db_queue, None
+        if pending is not None:
+            pending.put(_STOP_WRITER)
+            self._db_writer.join()
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            # Refresh planner statistics for the indexes this connection used,
+            # and fold the WAL back into the database file
+            try:
+                conn.execute('PRAGMA optimize')
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not optimize dashboard database on close: {e}")
+            conn.close()
+        self._local = threading.local()
     
     def init_database(self):
         """Initialize SQLite database with required tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_conn()
+        conn.executescript(DATABASE_PRAGMAS)
         cursor = conn.cursor()
         
         # Trades table for individual trades
@@ -86,53 +291,107 @@ class DashboardStateManager(TradingStateManager):
             )
         ''')
         
+        # Timestamp indexes: the dashboard reads every table newest-first
+        # (ORDER BY timestamp DESC LIMIT n), which otherwise scans and sorts
+        for table in ('trades', 'equity_snapshots', 'performance_metrics', 'system_health'):
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp DESC)'
+            )
+        # Win/loss statistics filter closed trades by action and pnl sign
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_trades_action_pnl ON trades(action, pnl)')
+        
+        # Closing equity per day (the day is the timestamp's date part), kept
+        # current by a trigger so every writer of equity_snapshots updates it;
+        # the daily P&L lookup becomes a primary-key read
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS daily_equity (
+                day TEXT PRIMARY KEY,
+                close_timestamp TEXT NOT NULL,
+                close_equity REAL NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_equity_snapshots_daily
+            AFTER INSERT ON equity_snapshots
+            BEGIN
+                INSERT INTO daily_equity (day, close_timestamp, close_equity)
+                VALUES (substr(NEW.timestamp, 1, 10), NEW.timestamp, NEW.total_equity)
+                ON CONFLICT(day) DO UPDATE SET
+                    close_timestamp = excluded.close_timestamp,
+                    close_equity = excluded.close_equity
+                WHERE excluded.close_timestamp >= daily_equity.close_timestamp;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_equity_snapshots_daily_delete
+            AFTER DELETE ON equity_snapshots
+            WHEN OLD.timestamp = (SELECT close_timestamp FROM daily_equity
+                                  WHERE day = substr(OLD.timestamp, 1, 10))
+            BEGIN
+                DELETE FROM daily_equity WHERE day = substr(OLD.timestamp, 1, 10);
+                INSERT INTO daily_equity (day, close_timestamp, close_equity)
+                SELECT substr(timestamp, 1, 10), timestamp, total_equity
+                FROM equity_snapshots
+                WHERE timestamp >= substr(OLD.timestamp, 1, 10)
+                  AND timestamp < date(substr(OLD.timestamp, 1, 10), '+1 day')
+                ORDER BY timestamp DESC LIMIT 1;
+            END
+        ''')
+        # Databases created before the table existed: fill it from the history
+        if cursor.execute('SELECT NOT EXISTS (SELECT 1 FROM daily_equity)').fetchone()[0]:
+            cursor.execute('''
+                INSERT INTO daily_equity (day, close_timestamp, close_equity)
+                SELECT substr(timestamp, 1, 10) AS day, MAX(timestamp), total_equity
+                FROM equity_snapshots GROUP BY day
+            ''')
+        
         conn.commit()
-        conn.close()
         self.logger.info("Dashboard database initialized successfully")
     
     def log_trade(self, trade_data):
-        """Log individual trade to database with strategy name validation"""
+        """
+        Log a trade (dict) or a batch of trades to database with strategy name validation.
+        A batch is inserted with multi-row INSERTs in a single transaction.
+        """
+        trades = [trade_data] if isinstance(trade_data, dict) else list(trade_data)
+        if not trades:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            rows = [self._trade_row(trade) for trade in trades]
             
-            # Validate and normalize strategy name
-            strategy_name = trade_data.get('strategy', '')
-            if strategy_name and not validate_strategy_name(strategy_name):
-                self.logger.warning(f"Unknown strategy name: {strategy_name}")
+            self._write(self._TRADE_INSERT_SQL, rows)
             
-            # Convert class name to database format if needed
-            db_strategy_name = get_strategy_db_name(strategy_name) if strategy_name else ''
-            
-            cursor.execute('''
-                INSERT INTO trades 
-                (timestamp, symbol, strategy, action, quantity, price, pnl, fee, paper_traded, entry_price, exit_price)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                trade_data.get('timestamp', datetime.now().isoformat()),
-                trade_data.get('symbol', ''),
-                db_strategy_name,
-                trade_data.get('action', ''),
-                trade_data.get('quantity', 0),
-                trade_data.get('price', 0),
-                trade_data.get('pnl', 0),
-                trade_data.get('fee', 0),
-                trade_data.get('paper_traded', False),
-                trade_data.get('entry_price'),
-                trade_data.get('exit_price')
-            ))
-            
-            conn.commit()
-            conn.close()
-            self.logger.info(f"Trade logged: {trade_data.get('action')} {trade_data.get('symbol')} ({db_strategy_name})")
+            if self.logger.isEnabledFor(logging.INFO):
+                for trade, row in zip(trades, rows):
+                    self.logger.info("Trade logged: %s %s (%s)", trade.get('action'), trade.get('symbol'), row[2])
             
         except Exception as e:
             self.logger.error(f"Failed to log trade: {e}")
     
+    def _trade_row(self, trade_data):
+        """Build the trades table row for one trade, normalizing its strategy name"""
+        # Validate and normalize strategy name
+        strategy_name = trade_data.get('strategy', '')
+        if strategy_name and not validate_strategy_name(strategy_name):
+            self.logger.warning(f"Unknown strategy name: {strategy_name}")
+        
+        # Convert class name to database format if needed
+        db_strategy_name = get_strategy_db_name(strategy_name) if strategy_name else ''
+        
+        try:
+            row = _trade_values(trade_data)
+        except KeyError:
+            # Incomplete trade: fill the missing columns with their defaults
+            row = tuple(trade_data.get(column, default)
+                        for column, default in zip(TRADE_COLUMNS, TRADE_DEFAULTS))
+            if 'timestamp' not in trade_data:
+                row = (datetime.now().isoformat(),) + row[1:]
+        return row[:2] + (db_strategy_name,) + row[3:]
+    
     def log_equity_snapshot(self, position_manager, current_prices=None):
         """Log current equity snapshot with improved strategy handling"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_conn()
             cursor = conn.cursor()
             
             # Calculate equity breakdown
@@ -147,29 +406,33 @@ class DashboardStateManager(TradingStateManager):
             
             if current_prices:
                 position_manager.update_unrealized_pnl(current_prices)
-                for pos_id, pos in open_positions.items():
-                    unrealized_pnl += pos.get('unrealized_pnl', 0)
-                    
-                    # Use strategy constants for consistent comparison
-                    strategy = pos.get('strategy', '')
-                    db_strategy = get_strategy_db_name(strategy)
-                    
-                    position_value = pos.get('quantity', 0) * current_prices.get(pos.get('symbol', ''), 0)
-                    
-                    if db_strategy == StrategyNames.ICHIMOKU_DB:
-                        ichimoku_equity += position_value
-                    elif db_strategy == StrategyNames.REVERSAL_DB:
-                        reversal_equity += position_value
-                    else:
-                        # Handle unknown strategies gracefully
-                        self.logger.warning(f"Unknown strategy in position: {strategy}")
-            
-            # Get previous day's equity for daily P&L calculation
-            cursor.execute('''
-                SELECT total_equity FROM equity_snapshots 
-                WHERE date(timestamp) = date('now', '-1 day')
-                ORDER BY timestamp DESC LIMIT 1
-            ''')
+                positions = position_manager.positions_as_arrays()
+                unrealized_pnl = float(positions['unrealized'].sum())
+                
+                # Use strategy constants for consistent comparison; names are
+                # mapped once per distinct strategy, not once per position
+                strategies = positions['strategy']
+                names, inverse = np.unique(strategies, return_inverse=True)
+                db_strategies = np.array([get_strategy_db_name(name) for name in names], dtype=object)[inverse]
+                
+                prices = np.array([current_prices.get(symbol, 0) for symbol in positions['symbol']], dtype=np.float64)
+                position_values = positions['quantity'] * prices
+                
+                is_ichimoku = db_strategies == StrategyNames.ICHIMOKU_DB
+                is_reversal = db_strategies == StrategyNames.REVERSAL_DB
+                ichimoku_equity = float(position_values[is_ichimoku].sum())
+                reversal_equity = float(position_values[is_reversal].sum())
+                
+                # Handle unknown strategies gracefully
+                for strategy in strategies[~(is_ichimoku | is_reversal)]:
+                    self.logger.warning(f"Unknown strategy in position: {strategy}")
+            
+            # Get previous day's (UTC, as SQLite's date('now', '-1 day')) closing
+            # equity for daily P&L calculation
+            yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+            cursor.execute(
+                'SELECT close_equity FROM daily_equity WHERE day = ?', (yesterday.isoformat(),)
+            )
             previous_day_result = cursor.fetchone()
             previous_day_equity = previous_day_result[0] if previous_day_result else 0
             
@@ -178,11 +441,7 @@ class DashboardStateManager(TradingStateManager):
             total_equity = base_equity
             daily_pnl = total_equity - previous_day_equity if previous_day_equity > 0 else 0
             
-            cursor.execute('''
-                INSERT INTO equity_snapshots 
-                (timestamp, total_equity, ichimoku_equity, reversal_equity, open_positions, unrealized_pnl, daily_pnl)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            self._write(self._EQUITY_INSERT_SQL, [(
                 datetime.now().isoformat(),
                 total_equity,
                 ichimoku_equity,
@@ -190,11 +449,9 @@ class DashboardStateManager(TradingStateManager):
                 open_position_count,
                 unrealized_pnl,
                 daily_pnl
-            ))
+            )])
             
-            conn.commit()
-            conn.close()
-            self.logger.info(f"Equity snapshot logged: ${total_equity:.2f}")
+            self.logger.info("Equity snapshot logged: $%.2f", total_equity)
             
         except Exception as e:
             self.logger.error(f"Failed to log equity snapshot: {e}")
@@ -202,14 +459,7 @@ class DashboardStateManager(TradingStateManager):
     def log_equity_snapshot_direct(self, equity_data):
         """Log equity snapshot directly from provided data (for populate_dashboard.py)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO equity_snapshots 
-                (timestamp, total_equity, ichimoku_equity, reversal_equity, open_positions, unrealized_pnl, daily_pnl)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            self._write(self._EQUITY_INSERT_SQL, [(
                 equity_data.get('timestamp', datetime.now().isoformat()),
                 equity_data.get('total_equity', 0),
                 equity_data.get('ichimoku_equity', 0),
@@ -217,10 +467,7 @@ class DashboardStateManager(TradingStateManager):
                 equity_data.get('open_positions', 0),
                 equity_data.get('unrealized_pnl', 0),
                 equity_data.get('daily_pnl', 0)
-            ))
-            
-            conn.commit()
-            conn.close()
+            )])
             
         except Exception as e:
             self.logger.error(f"Failed to log equity snapshot directly: {e}")
@@ -228,61 +475,53 @@ class DashboardStateManager(TradingStateManager):
     def log_performance_metrics(self):
         """Calculate and log performance metrics"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            self.flush_db()  # Include queued trades and snapshots in the statistics
+            conn = self._get_conn()
             cursor = conn.cursor()
             
-            # Get trade statistics
-            cursor.execute('SELECT COUNT(*) FROM trades WHERE action = "SELL"')
-            total_trades = cursor.fetchone()[0] or 0
-            
-            cursor.execute('SELECT COUNT(*) FROM trades WHERE action = "SELL" AND pnl > 0')
-            winning_trades = cursor.fetchone()[0] or 0
-            
-            cursor.execute('SELECT COUNT(*) FROM trades WHERE action = "SELL" AND pnl <= 0')
-            losing_trades = cursor.fetchone()[0] or 0
+            # Get trade statistics (counts and gross profit/loss in one pass)
+            cursor.execute('''
+                SELECT SUM(action = 'SELL'),
+                       SUM(action = 'SELL' AND pnl > 0),
+                       SUM(action = 'SELL' AND pnl <= 0),
+                       SUM(CASE WHEN action = 'SELL' AND pnl > 0 THEN pnl ELSE 0 END),
+                       SUM(CASE WHEN action = 'SELL' AND pnl < 0 THEN -pnl ELSE 0 END)
+                FROM trades
+            ''')
+            total_trades, winning_trades, losing_trades, gross_profit, gross_loss = (
+                value or 0 for value in cursor.fetchone()
+            )
             
             win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
             
             # Calculate profit factor
-            cursor.execute('SELECT SUM(pnl) FROM trades WHERE action = "SELL" AND pnl > 0')
-            gross_profit = cursor.fetchone()[0] or 0
-            
-            cursor.execute('SELECT SUM(ABS(pnl)) FROM trades WHERE action = "SELL" AND pnl < 0')
-            gross_loss = cursor.fetchone()[0] or 0
-            
             profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0
             
-            # Calculate max drawdown and total return
-            cursor.execute('SELECT total_equity FROM equity_snapshots ORDER BY timestamp')
-            equity_data = cursor.fetchall()
+            # Calculate max drawdown (against the running peak) and total return
+            # (last vs first snapshot) with window functions inside SQLite
+            cursor.execute('''
+                WITH curve AS (
+                    SELECT total_equity,
+                           MAX(total_equity) OVER running AS peak,
+                           ROW_NUMBER() OVER running AS n,
+                           COUNT(*) OVER () AS snapshots
+                    FROM equity_snapshots
+                    WINDOW running AS (ORDER BY timestamp, id ROWS UNBOUNDED PRECEDING)
+                )
+                SELECT MAX((peak - total_equity) / peak),
+                       MAX(CASE WHEN n = 1 THEN total_equity END),
+                       MAX(CASE WHEN n = snapshots THEN total_equity END)
+                FROM curve
+            ''')
+            max_drawdown, initial_equity, current_equity = cursor.fetchone()
             
-            max_drawdown = 0
             total_return = 0
-            
-            if equity_data:
-                equity_values = [row[0] for row in equity_data]
-                initial_equity = equity_values[0]
-                current_equity = equity_values[-1]
-                
+            if initial_equity is not None:
                 total_return = ((current_equity - initial_equity) / initial_equity * 100) if initial_equity > 0 else 0
-                
-                # Calculate max drawdown
-                peak = initial_equity
-                for equity in equity_values:
-                    if equity > peak:
-                        peak = equity
-                    drawdown = (peak - equity) / peak
-                    if drawdown > max_drawdown:
-                        max_drawdown = drawdown
-                
-                max_drawdown *= 100  # Convert to percentage
+            max_drawdown = (max_drawdown or 0) * 100  # Convert to percentage
             
             # Insert performance metrics
-            cursor.execute('''
-                INSERT INTO performance_metrics 
-                (timestamp, total_trades, winning_trades, losing_trades, win_rate, profit_factor, max_drawdown, total_return)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            self._write(self._METRICS_INSERT_SQL, [(
                 datetime.now().isoformat(),
                 total_trades,
                 winning_trades,
@@ -291,10 +530,8 @@ class DashboardStateManager(TradingStateManager):
                 profit_factor,
                 max_drawdown,
                 total_return
-            ))
+            )])
             
-            conn.commit()
-            conn.close()
             self.logger.info("Performance metrics updated")
             
         except Exception as e:
@@ -303,37 +540,31 @@ class DashboardStateManager(TradingStateManager):
     def log_system_health(self, status="running", api_connected=True, error_count=0, cpu_usage=0.0, memory_usage=0.0, active_connections=0):
         """Log system health status with enhanced metrics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get last trade time
-            cursor.execute('SELECT timestamp FROM trades ORDER BY timestamp DESC LIMIT 1')
-            last_trade_result = cursor.fetchone()
-            last_trade_time = last_trade_result[0] if last_trade_result else None
-            
-            cursor.execute('''
-                INSERT INTO system_health 
-                (timestamp, status, last_trade_time, api_connection, error_count)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
+            # Last trade time is looked up when the row is written, so it also
+            # sees trades still queued ahead of it
+            self._write(self._HEALTH_INSERT_SQL, [(
                 datetime.now().isoformat(),
                 status,
-                last_trade_time,
                 api_connected,
                 error_count
-            ))
-            
-            conn.commit()
-            conn.close()
+            )])
             
         except Exception as e:
             self.logger.error(f"Failed to log system health: {e}")
     
     def get_dashboard_summary(self):
-        """Get summary data for dashboard"""
+        """
+        Get summary data for dashboard. Rows are sqlite3.Row (index or column
+        name access); the summary is cached for SUMMARY_TTL seconds.
+        """
+        cached = self._summary_cache
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
         try:
-            conn = sqlite3.connect(self.db_path)
+            self.flush_db()
+            conn = self._get_conn()
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             
             # Get latest metrics
             cursor.execute('''
@@ -354,14 +585,14 @@ class DashboardStateManager(TradingStateManager):
             ''')
             latest_health = cursor.fetchone()
             
-            conn.close()
-            
-            return {
+            summary = {
                 'metrics': latest_metrics,
                 'equity': latest_equity,
                 'health': latest_health,
                 'last_updated': datetime.now().isoformat()
             }
+            self._summary_cache = (time.monotonic() + SUMMARY_TTL, summary)
+            return summary
             
         except Exception as e:
             self.logger.error(f"Failed to get dashboard summary: {e}")
@@ -1,17 +1,24 @@
 import ccxt
+import numpy as np
 import pandas as pd
-import decimal
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import random
 import time
-import traceback
 import os
 import logging
+import json
+import socket
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 from typing import Optional, Tuple, Dict, Any
-from config import Config, ConfigValidationError
-
-# Load environment variables from .env file
-load_dotenv()
+# config loads the .env file before reading any setting
+from config import Config, ConfigValidationError, MARKETS_CACHE_DIR, ensure_initialized
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,12 +32,12 @@ ALPACA_API_SECRET = os.getenv('ALPACA_API_SECRET')
 # Bybit Configuration
 BYBIT_API_KEY = os.getenv('BYBIT_API_KEY')
 BYBIT_API_SECRET = os.getenv('BYBIT_API_SECRET')
-BYBIT_TESTNET = os.getenv('BYBIT_TESTNET', 'true').lower() == 'true'
+BYBIT_TESTNET = Config.BYBIT_TESTNET
 
 # Binance Configuration
 BINANCE_API_KEY = os.getenv('BINANCE_API_KEY')
 BINANCE_API_SECRET = os.getenv('BINANCE_API_SECRET')
-BINANCE_TESTNET = os.getenv('BINANCE_TESTNET', 'true').lower() == 'true'
+BINANCE_TESTNET = Config.BINANCE_TESTNET
 
 # Validate that required keys are loaded
 if not BYBIT_API_KEY or not BYBIT_API_SECRET:
@@ -41,6 +48,110 @@ if not BINANCE_API_KEY or not BINANCE_API_SECRET:
     
 logger.info("Please create a .env file with your API keys or set them as environment variables.")
 
+# One client per (exchange, credentials, sandbox) for the whole process: retries
+# and re-initialisation reuse it, and with it the markets it already loaded
+_exchange_clients = {}
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets keep TCP_NODELAY (urllib3's default)
+    and add SO_KEEPALIVE, so idle connections to the exchange stay usable"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+def _tune_session(exchange):
+    """Give a CCXT client's requests session a larger keep-alive connection pool"""
+    session = getattr(exchange, 'session', None)
+    if isinstance(session, requests.Session):
+        # Sized for concurrent page fetches sharing the client
+        session.mount('https://', _KeepAliveAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+
+# Markets saved by an earlier run are reused for this many seconds
+MARKETS_CACHE_TTL = 6 * 3600
+
+def _load_markets(exchange, testnet: bool):
+    """load_markets, reusing a saved copy younger than MARKETS_CACHE_TTL
+    instead of downloading and parsing every market definition again.
+    The copy is plain JSON, so a tampered cache file cannot run code"""
+    if exchange.markets:
+        return exchange.markets
+    
+    path = os.path.join(MARKETS_CACHE_DIR, f"{exchange.id}{'_testnet' if testnet else ''}.json")
+    try:
+        with open(path, 'rb') as f:
+            cached = json.load(f)
+        if time.time() - cached['timestamp'] < MARKETS_CACHE_TTL:
+            return exchange.set_markets(cached['markets'], cached['currencies'])
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable markets cache {path}: {e}")
+    
+    markets = exchange.load_markets()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(MARKETS_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            json.dump({'timestamp': time.time(), 'markets': exchange.markets,
+                       'currencies': exchange.currencies}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write markets cache {path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+    return markets
+
+# Health checks fetch the balance at most once per this many seconds per client
+HEALTH_BALANCE_TTL = 60.0
+_balance_checked_at = {}
+
+def _fetch_balance(exchange) -> Dict[str, Any]:
+    """fetch_balance that also records the success, so a health check right
+    after start-up (or another recent fetch) reuses it instead of refetching"""
+    balance_info = exchange.fetch_balance()
+    _balance_checked_at[id(exchange)] = time.monotonic()
+    return balance_info
+
+# Health probes (markets, balance) run side by side and are given at most
+# this many seconds in total; a hung probe is reported, not waited for
+HEALTH_PROBE_TIMEOUT = 5.0
+_health_probe_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="health-probe")
+
+class _RateBucket:
+    """Spaces requests to one exchange at least `interval` seconds apart,
+    across every coroutine (and event loop) sharing the client"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+    
+    async def acquire(self):
+        # Reserve the next free slot, then sleep until it comes round
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# One bucket per sync client for async fetches: its own rate limiter is not
+# shared between the worker threads those fetches run in
+_rate_buckets = {}
+
+def _rate_bucket(exchange) -> _RateBucket:
+    bucket = _rate_buckets.get(id(exchange))
+    if bucket is None:
+        rate_limit_ms = getattr(exchange, 'rateLimit', 0)
+        interval = rate_limit_ms / 1000 if isinstance(rate_limit_ms, (int, float)) else 0.0
+        bucket = _rate_buckets.setdefault(id(exchange), _RateBucket(interval))
+    return bucket
+
 class ExchangeError(Exception):
     """Custom exception for exchange-related errors"""
     pass
@@ -49,9 +160,15 @@ class RetryableExchangeError(ExchangeError):
     """Exception for errors that should be retried"""
     pass
 
+def _retry_wait(attempt: int, delay: float, backoff: float) -> float:
+    """Full-jitter backoff: uniform in [0, delay * backoff**attempt], so many
+    callers failing together do not all retry at the same instant"""
+    return random.uniform(0, delay * (backoff ** attempt))
+
 def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
     """Decorator for retrying failed exchange operations"""
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             last_exception = None
             for attempt in range(max_retries + 1):
@@ -60,7 +177,7 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
                 except RetryableExchangeError as e:
                     last_exception = e
                     if attempt < max_retries:
-                        wait_time = delay * (backoff ** attempt)
+                        wait_time = _retry_wait(attempt, delay, backoff)
                         logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time:.1f}s...")
                         time.sleep(wait_time)
                     else:
@@ -73,7 +190,7 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
                     # Unexpected errors
                     logger.error(f"Unexpected error in {func.__name__}: {e}")
                     if attempt < max_retries:
-                        wait_time = delay * (backoff ** attempt)
+                        wait_time = _retry_wait(attempt, delay, backoff)
                         logger.warning(f"Retrying unexpected error in {wait_time:.1f}s...")
                         time.sleep(wait_time)
                         last_exception = e
@@ -84,6 +201,42 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float =
         return wrapper
     return decorator
 
+def async_retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
+    """retry_on_failure for coroutines: waits with asyncio.sleep, so other tasks keep running"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            last_exception = None
+            for attempt in range(max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except RetryableExchangeError as e:
+                    last_exception = e
+                    if attempt < max_retries:
+                        wait_time = _retry_wait(attempt, delay, backoff)
+                        logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait_time:.1f}s...")
+                        await asyncio.sleep(wait_time)
+                    else:
+                        logger.error(f"All {max_retries + 1} attempts failed for {func.__name__}")
+                except ExchangeError as e:
+                    # Non-retryable errors
+                    logger.error(f"Non-retryable error in {func.__name__}: {e}")
+                    raise
+                except Exception as e:
+                    # Unexpected errors
+                    logger.error(f"Unexpected error in {func.__name__}: {e}")
+                    if attempt < max_retries:
+                        wait_time = _retry_wait(attempt, delay, backoff)
+                        logger.warning(f"Retrying unexpected error in {wait_time:.1f}s...")
+                        await asyncio.sleep(wait_time)
+                        last_exception = e
+                    else:
+                        raise
+            
+            raise last_exception
+        return wrapper
+    return decorator
+
 @retry_on_failure(max_retries=3, delay=1.0)
 def initialize_exchange(exchange_name="bybit", api_key=None, secret_key=None, paper_mode=True) -> Tuple[Optional[Any], float]:
     """
@@ -92,31 +245,23 @@ def initialize_exchange(exchange_name="bybit", api_key=None, secret_key=None, pa
     Returns:
         Tuple of (exchange_object, balance) or (None, 0.0) on failure
     """
+    ensure_initialized()
+    name = exchange_name.lower() if isinstance(exchange_name, str) else exchange_name
     try:
         # Validate exchange name
-        if exchange_name not in ['bybit', 'alpaca', 'binance']:
-            raise ExchangeError(f"Unsupported exchange: {exchange_name}")
-        
-        # Validate inputs
-        if not exchange_name or not isinstance(exchange_name, str):
-            raise ExchangeError("Exchange name must be a non-empty string")
+        initializer = _EXCHANGE_INITIALIZERS.get(name) if isinstance(name, str) else None
+        if initializer is None:
+            raise ExchangeError(f"Unsupported exchange: {name}")
         
-        logger.info(f"Initializing {exchange_name.upper()} exchange connection...")
+        logger.info(f"Initializing {name.upper()} exchange connection...")
         
-        if exchange_name.lower() == "bybit":
-            return _initialize_bybit(api_key, secret_key, paper_mode)
-        elif exchange_name.lower() == "alpaca":
-            return _initialize_alpaca(api_key, secret_key, paper_mode)
-        elif exchange_name.lower() == "binance":
-            return _initialize_binance(api_key, secret_key, paper_mode)
-        else:
-            raise ExchangeError(f"Exchange {exchange_name} not implemented")
+        return initializer(api_key, secret_key, paper_mode)
             
     except (ExchangeError, RetryableExchangeError):
         raise
     except Exception as e:
-        logger.error(f"Unexpected error initializing {exchange_name}: {e}")
-        raise RetryableExchangeError(f"Failed to initialize {exchange_name}: {e}")
+        logger.error(f"Unexpected error initializing {name}: {e}")
+        raise RetryableExchangeError(f"Failed to initialize {name}: {e}")
 
 def _initialize_bybit(api_key=None, secret_key=None, paper_mode=True) -> Tuple[Optional[Any], float]:
     """Initialize Bybit exchange with error handling"""
@@ -146,12 +291,16 @@ def _initialize_bybit(api_key=None, secret_key=None, paper_mode=True) -> Tuple[O
         
         logger.info(f"Using Bybit {'Testnet' if BYBIT_TESTNET else 'Mainnet'}")
         
-        # Initialize exchange
-        exchange = ccxt.bybit(exchange_config)
+        # Initialize exchange (or reuse the client from an earlier attempt)
+        client_key = ('bybit', api_key, BYBIT_TESTNET)
+        exchange = _exchange_clients.get(client_key)
+        if exchange is None:
+            exchange = _exchange_clients[client_key] = ccxt.bybit(exchange_config)
+            _tune_session(exchange)
         
         # Test connection
         try:
-            exchange.load_markets()
+            _load_markets(exchange, BYBIT_TESTNET)
             logger.info("✅ Bybit markets loaded successfully")
         except Exception as e:
             error_msg = str(e).lower()
@@ -170,9 +319,9 @@ def _initialize_bybit(api_key=None, secret_key=None, paper_mode=True) -> Tuple[O
         # Fetch account balance
         balance = 0.0
         try:
-            balance_info = exchange.fetch_balance()
+            balance_info = _fetch_balance(exchange)
             balance = balance_info.get('USDT', {}).get('total', 0.0)
-            logger.info(f"💰 Current USDT balance: {balance:.2f}")
+            logger.info("💰 Current USDT balance: %.2f", balance)
         except Exception as e:
             logger.warning(f"Could not fetch balance (proceeding anyway): {e}")
         
@@ -214,23 +363,27 @@ def _initialize_binance(api_key=None, secret_key=None, paper_mode=True) -> Tuple
         
         logger.info("Using Binance Testnet" if BINANCE_TESTNET else "Using Binance Mainnet")
         
-        # Initialize Binance exchange
-        exchange = ccxt.binance({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'sandbox': BINANCE_TESTNET,  # Use testnet if enabled
-            'enableRateLimit': True,
-            'timeout': 30000,
-            'options': {
-                'defaultType': 'spot',  # Use spot trading
-            }
-        })
+        # Initialize Binance exchange (or reuse the client from an earlier attempt)
+        client_key = ('binance', api_key, BINANCE_TESTNET)
+        exchange = _exchange_clients.get(client_key)
+        if exchange is None:
+            exchange = _exchange_clients[client_key] = ccxt.binance({
+                'apiKey': api_key,
+                'secret': secret_key,
+                'sandbox': BINANCE_TESTNET,  # Use testnet if enabled
+                'enableRateLimit': True,
+                'timeout': 30000,
+                'options': {
+                    'defaultType': 'spot',  # Use spot trading
+                }
+            })
+            _tune_session(exchange)
         
         # Load markets
-        exchange.load_markets()
+        _load_markets(exchange, BINANCE_TESTNET)
         
         # Get account balance
-        balance_info = exchange.fetch_balance()
+        balance_info = _fetch_balance(exchange)
         
         # Calculate total balance (sum of all assets in USD equivalent)
         total_balance = 0.0
@@ -245,7 +398,7 @@ def _initialize_binance(api_key=None, secret_key=None, paper_mode=True) -> Tuple
                     total_balance = amount
                     break
         
-        logger.info(f"✅ Binance connection successful! Balance: ${total_balance:.2f}")
+        logger.info("✅ Binance connection successful! Balance: $%.2f", total_balance)
         return exchange, total_balance
         
     except ccxt.NetworkError as e:
@@ -259,6 +412,13 @@ def _initialize_binance(api_key=None, secret_key=None, paper_mode=True) -> Tuple
         logger.error(f"Unexpected error in Binance initialization: {e}")
         raise RetryableExchangeError(f"Unexpected Binance error: {e}")
 
+# Supported exchanges; adding one is a new _initialize_<name> plus its entry here
+_EXCHANGE_INITIALIZERS = {
+    'bybit': _initialize_bybit,
+    'alpaca': _initialize_alpaca,
+    'binance': _initialize_binance,
+}
+
 @retry_on_failure(max_retries=2, delay=0.5)
 def execute_trade(symbol: str, side: str, amount_base_currency_to_trade: float, 
                  exchange_obj=None, exchange=None, price: float = None, 
@@ -288,42 +448,16 @@ def execute_trade(symbol: str, side: str, amount_base_currency_to_trade: float,
         if not exchange_instance:
             raise ExchangeError("No exchange object provided")
         
-        # Validate and sanitize symbol
-        try:
-            symbol = Config.sanitize_symbol(symbol)
-        except ConfigValidationError as e:
-            raise ExchangeError(f"Invalid symbol: {e}")
-        
-        # Validate parameters
-        if side.lower() not in ['buy', 'sell']:
-            raise ExchangeError(f"Invalid side: {side}. Must be 'buy' or 'sell'")
-        
-        if not isinstance(amount_base_currency_to_trade, (int, float)) or amount_base_currency_to_trade <= 0:
-            raise ExchangeError("Amount must be a positive number")
-        
-        if price is not None and (not isinstance(price, (int, float)) or price <= 0):
-            raise ExchangeError("Price must be a positive number if specified")
-        
-        if order_type not in ['market', 'limit']:
-            raise ExchangeError(f"Invalid order type: {order_type}. Must be 'market' or 'limit'")
+        order_params = _order_params(symbol, side, amount_base_currency_to_trade, price, order_type)
+        symbol = order_params['symbol']
         
-        logger.info(f"🔄 Executing {side.upper()} order: {amount_base_currency_to_trade} {symbol} @ {price or current_price or 'market'}")
-        
-        # Prepare order parameters
-        order_params = {
-            'symbol': symbol,
-            'type': order_type,
-            'side': side,
-            'amount': amount_base_currency_to_trade,
-        }
-        
-        if order_type == 'limit' and price is not None:
-            order_params['price'] = price
+        logger.info("🔄 Executing %s order: %s %s @ %s", side.upper(), amount_base_currency_to_trade, symbol,
+                    price or current_price or 'market')
         
         # Execute order
         try:
             order = exchange_instance.create_order(**order_params)
-            logger.info(f"✅ Order executed successfully: {order.get('id', 'N/A')}")
+            logger.info("✅ Order executed successfully: %s", order.get('id', 'N/A'))
             return order
             
         except ccxt.InsufficientFunds as e:
@@ -343,75 +477,359 @@ def execute_trade(symbol: str, side: str, amount_base_currency_to_trade: float,
         logger.error(f"Unexpected error executing trade: {e}")
         raise RetryableExchangeError(f"Unexpected trade execution error: {e}")
 
+# Most orders one batch request may carry (Bybit spot's create-batch limit)
+BATCH_ORDER_LIMIT = 10
+
+def _order_params(symbol: str, side: str, amount: float, price: float = None,
+                  order_type: str = "market") -> Dict[str, Any]:
+    """Validate an order and return its create_order parameters"""
+    # Validate and sanitize symbol
+    try:
+        symbol = Config.sanitize_symbol(symbol)
+    except ConfigValidationError as e:
+        raise ExchangeError(f"Invalid symbol: {e}")
+    
+    # Validate parameters
+    if side.lower() not in ['buy', 'sell']:
+        raise ExchangeError(f"Invalid side: {side}. Must be 'buy' or 'sell'")
+    
+    if not isinstance(amount, (int, float)) or amount <= 0:
+        raise ExchangeError("Amount must be a positive number")
+    
+    if price is not None and (not isinstance(price, (int, float)) or price <= 0):
+        raise ExchangeError("Price must be a positive number if specified")
+    
+    if order_type not in ['market', 'limit']:
+        raise ExchangeError(f"Invalid order type: {order_type}. Must be 'market' or 'limit'")
+    
+    # Prepare order parameters
+    order_params = {
+        'symbol': symbol,
+        'type': order_type,
+        'side': side,
+        'amount': amount,
+    }
+    
+    if order_type == 'limit' and price is not None:
+        order_params['price'] = price
+    
+    return order_params
+
+def execute_trades_batch(orders, exchange_obj=None, exchange=None) -> list:
+    """
+    Execute several orders, e.g. a portfolio rebalance, with as few requests as possible
+    
+    Args:
+        orders: List of dicts with 'symbol', 'side', 'amount' and optionally
+                'price' and 'order_type' (same meaning as execute_trade's arguments)
+        exchange_obj: Exchange object (preferred parameter name)
+        exchange: Exchange object (legacy parameter name)
+    
+    Every order is validated before any is sent. Exchanges with a batch order
+    endpoint (CCXT createOrders) get up to BATCH_ORDER_LIMIT orders per request;
+    others get one create_order call per order. Unlike execute_trade this is
+    not retried, since a failed batch may already have been partly filled.
+    
+    Returns:
+        List of order receipts in the order given
+    """
+    exchange_instance = exchange_obj or exchange
+    if not exchange_instance:
+        raise ExchangeError("No exchange object provided")
+    
+    order_params = [
+        _order_params(order['symbol'], order['side'], order['amount'],
+                      order.get('price'), order.get('order_type', 'market'))
+        for order in orders
+    ]
+    logger.info("🔄 Executing %d orders", len(order_params))
+    
+    try:
+        if exchange_instance.has.get('createOrders'):
+            receipts = []
+            for start in range(0, len(order_params), BATCH_ORDER_LIMIT):
+                receipts.extend(exchange_instance.create_orders(order_params[start:start + BATCH_ORDER_LIMIT]))
+        else:
+            receipts = [exchange_instance.create_order(**params) for params in order_params]
+        logger.info("✅ %d orders executed", len(receipts))
+        return receipts
+        
+    except ccxt.InsufficientFunds as e:
+        raise ExchangeError(f"Insufficient funds for batch orders: {e}")
+    except ccxt.InvalidOrder as e:
+        raise ExchangeError(f"Invalid order parameters: {e}")
+    except ccxt.NetworkError as e:
+        raise RetryableExchangeError(f"Network error during batch order execution: {e}")
+    except ccxt.ExchangeError as e:
+        raise ExchangeError(f"Exchange error during batch order execution: {e}")
+
+@retry_on_failure(max_retries=2, delay=0.5)
+def fetch_free_balance(exchange_obj, currency: str = "USDT") -> float:
+    """
+    Free (spendable) balance of one currency
+    
+    Returns:
+        The free amount, 0.0 if the account holds none
+    """
+    if not exchange_obj:
+        raise ExchangeError("No exchange object provided")
+    
+    try:
+        balance_info = _fetch_balance(exchange_obj)
+        return float((balance_info.get(currency) or {}).get('free') or 0.0)
+        
+    except ccxt.NetworkError as e:
+        raise RetryableExchangeError(f"Network error fetching balance: {e}")
+    except ccxt.ExchangeError as e:
+        raise ExchangeError(f"Exchange error fetching balance: {e}")
+
+def _parse_ohlcv_request(exchange_obj, symbol: str, timeframe: str,
+                         start_date_str: str = None, end_date_str: str = None) -> Tuple[str, Optional[int], Optional[int]]:
+    """Validate an OHLCV request; returns (sanitized symbol, since ms, until ms)"""
+    if not exchange_obj:
+        raise ExchangeError("Exchange object is None")
+    
+    # Validate and sanitize symbol
+    try:
+        symbol = Config.sanitize_symbol(symbol)
+    except ConfigValidationError as e:
+        raise ExchangeError(f"Invalid symbol: {e}")
+    
+    # Validate timeframe
+    valid_timeframes = ['1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w']
+    if timeframe not in valid_timeframes:
+        raise ExchangeError(f"Invalid timeframe: {timeframe}. Valid options: {valid_timeframes}")
+    
+    logger.info("📊 Fetching %s data for %s", timeframe, symbol)
+    
+    # Parse date range
+    since = None
+    until = None
+    
+    if start_date_str:
+        try:
+            since = exchange_obj.parse8601(f"{start_date_str}T00:00:00Z")
+        except Exception as e:
+            raise ExchangeError(f"Invalid start date format: {start_date_str}. Use YYYY-MM-DD")
+    
+    if end_date_str:
+        try:
+            until = exchange_obj.parse8601(f"{end_date_str}T23:59:59Z")
+        except Exception as e:
+            raise ExchangeError(f"Invalid end date format: {end_date_str}. Use YYYY-MM-DD")
+    
+    return symbol, since, until
+
+def _ohlcv_frame(ohlcv, until: Optional[int] = None, dedupe: bool = False) -> pd.DataFrame:
+    """
+    CCXT candle rows (oldest first, a list or a float64 array) as an OHLCV
+    DataFrame, cut at `until` (ms).
+    With dedupe (rows merged from several pages) the rows are put in time
+    order and repeated timestamps keep their first candle.
+    """
+    # One float64 block for the candles, the millisecond timestamps
+    # reinterpreted as the datetime index
+    arr = np.asarray(ohlcv, dtype=np.float64)
+    if dedupe and len(arr):
+        order = np.argsort(arr[:, 0], kind='stable')
+        ts = arr[order, 0]
+        keep = np.empty(len(ts), dtype=bool)
+        keep[0] = True
+        np.not_equal(ts[1:], ts[:-1], out=keep[1:])
+        arr = arr[order[keep]]
+    
+    # Filter by end date if specified, on the raw millisecond timestamps before
+    # the frame exists (candles come oldest first, so a binary search finds the
+    # cut instead of a full boolean mask)
+    if until:
+        ts = arr[:, 0]
+        if np.all(ts[1:] >= ts[:-1]):
+            arr = arr[:np.searchsorted(ts, until, side='right')]
+        else:
+            arr = arr[ts <= until]
+    
+    index = pd.DatetimeIndex(arr[:, 0].astype(np.int64).view('datetime64[ms]'), name='datetime')
+    df = pd.DataFrame(arr[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                      index=index, copy=False)
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("✅ Fetched %d data points from %s to %s", len(df), df.index[0], df.index[-1])
+    return df
+
+def _ohlcv_cache_path(cache_dir, exchange_obj, symbol: str, timeframe: str) -> str:
+    return os.path.join(str(cache_dir), f"{exchange_obj.id}_{symbol.replace('/', '')}_{timeframe}.npy")
+
+def _read_ohlcv_cache(path: str) -> Optional[np.ndarray]:
+    """Cached candles (N, 6) float64, sorted and unique, or None if unreadable"""
+    try:
+        cached = np.load(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable OHLCV cache {path}: {e}")
+        return None
+    if cached.ndim != 2 or cached.shape[1] != 6 or not len(cached):
+        return None
+    return cached
+
+def _write_ohlcv_cache(path: str, candles: np.ndarray):
+    """Replace the cache file atomically, so a reader never sees half a file"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, candles)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write OHLCV cache {path}: {e}")
+
 @retry_on_failure(max_retries=2, delay=1.0)
 def fetch_historical_ohlcv(exchange_obj, symbol: str, timeframe: str = '4h', 
                           start_date_str: str = None, end_date_str: str = None, 
-                          limit: int = 1000) -> Optional[pd.DataFrame]:
+                          limit: int = 1000, cache_dir=None) -> Optional[pd.DataFrame]:
     """
     Fetch historical OHLCV data with comprehensive error handling
     
+    With cache_dir and a start date, closed candles are kept in a per
+    (exchange, symbol, timeframe) file there: candles already cached are
+    read back and only the ones after them are requested, and none at all
+    when the cache reaches the end date. The result is the same as without
+    the cache.
+    
     Returns:
         DataFrame with OHLCV data or None on failure
     """
     try:
-        if not exchange_obj:
-            raise ExchangeError("Exchange object is None")
-        
-        # Validate and sanitize symbol
-        try:
-            symbol = Config.sanitize_symbol(symbol)
-        except ConfigValidationError as e:
-            raise ExchangeError(f"Invalid symbol: {e}")
-        
-        # Validate timeframe
-        valid_timeframes = ['1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w']
-        if timeframe not in valid_timeframes:
-            raise ExchangeError(f"Invalid timeframe: {timeframe}. Valid options: {valid_timeframes}")
-        
-        logger.info(f"📊 Fetching {timeframe} data for {symbol}")
-        
-        # Parse date range
-        since = None
-        until = None
-        
-        if start_date_str:
-            try:
-                since = exchange_obj.parse8601(f"{start_date_str}T00:00:00Z")
-            except Exception as e:
-                raise ExchangeError(f"Invalid start date format: {start_date_str}. Use YYYY-MM-DD")
-        
-        if end_date_str:
-            try:
-                until = exchange_obj.parse8601(f"{end_date_str}T23:59:59Z")
-            except Exception as e:
-                raise ExchangeError(f"Invalid end date format: {end_date_str}. Use YYYY-MM-DD")
+        symbol, since, until = _parse_ohlcv_request(
+            exchange_obj, symbol, timeframe, start_date_str, end_date_str
+        )
+        
+        cache_path = cached = None
+        extends_cache = False
+        rows = np.empty((0, 6))
+        fetch_since, fetch_limit = since, limit
+        if cache_dir and since is not None:
+            tf_ms = exchange_obj.parse_timeframe(timeframe) * 1000
+            cache_path = _ohlcv_cache_path(cache_dir, exchange_obj, symbol, timeframe)
+            cached = _read_ohlcv_cache(cache_path)
+            # Usable when the cache holds the candle at `since` or ends just before it
+            if cached is not None and cached[0, 0] <= since <= cached[-1, 0] + tf_ms:
+                extends_cache = True
+                start = np.searchsorted(cached[:, 0], since, side='left')
+                rows = cached[start:start + limit]
+                fetch_since = max(since, int(cached[-1, 0]) + 1)
+                fetch_limit = limit - len(rows)
+                if not fetch_limit or (until and cached[-1, 0] + tf_ms > until):
+                    logger.info(f"Using {len(rows)} cached candles for {symbol}")
+                    return _ohlcv_frame(rows, until) if len(rows) else None
         
         # Fetch data
         try:
             ohlcv = exchange_obj.fetch_ohlcv(
                 symbol=symbol,
                 timeframe=timeframe,
-                since=since,
-                limit=limit
+                since=fetch_since,
+                limit=fetch_limit
             )
             
-            if not ohlcv:
+            if cache_path and ohlcv:
+                fetched = np.asarray(ohlcv, dtype=np.float64)
+                # Only closed candles are final; the one still forming is refetched next time
+                closed = fetched[fetched[:, 0] + tf_ms <= time.time() * 1000]
+                if len(closed):
+                    if extends_cache:
+                        closed = np.concatenate([cached, closed[closed[:, 0] > cached[-1, 0]]])
+                    elif cached is not None and closed[0, 0] < cached[0, 0] <= closed[-1, 0] + tf_ms:
+                        # An earlier range that runs into the cache: keep both
+                        closed = np.concatenate([closed, cached[cached[:, 0] > closed[-1, 0]]])
+                    _write_ohlcv_cache(cache_path, closed)
+            if extends_cache:
+                # Cached candles are returned even when nothing newer came back
+                ohlcv = np.concatenate([rows, np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)])
+            
+            if not len(ohlcv):
                 logger.warning(f"No data returned for {symbol}")
                 return None
             
-            # Convert to DataFrame
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('datetime', inplace=True)
-            df.drop('timestamp', axis=1, inplace=True)
+            return _ohlcv_frame(ohlcv, until)
             
-            # Filter by end date if specified
-            if until:
-                end_datetime = pd.to_datetime(until, unit='ms')
-                df = df[df.index <= end_datetime]
+        except ccxt.NetworkError as e:
+            raise RetryableExchangeError(f"Network error fetching data: {e}")
+        except ccxt.ExchangeNotAvailable as e:
+            raise RetryableExchangeError(f"Exchange not available: {e}")
+        except ccxt.ExchangeError as e:
+            raise ExchangeError(f"Exchange error fetching data: {e}")
             
-            logger.info(f"✅ Fetched {len(df)} data points from {df.index[0]} to {df.index[-1]}")
-            return df
+    except (ExchangeError, RetryableExchangeError):
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error fetching historical data: {e}")
+        raise RetryableExchangeError(f"Unexpected data fetch error: {e}")
+
+@async_retry_on_failure(max_retries=2, delay=1.0)
+async def fetch_historical_ohlcv_async(exchange_obj, symbol: str, timeframe: str = '4h', 
+                                      start_date_str: str = None, end_date_str: str = None, 
+                                      limit: int = 1000) -> Optional[pd.DataFrame]:
+    """
+    Async fetch_historical_ohlcv. With both dates given the whole range is
+    fetched: its `limit`-candle pages are requested concurrently, but still
+    spaced out by the exchange's rate limit.
+    
+    Accepts ccxt.async_support clients (awaited directly, paced by their own
+    rate limiter) and regular clients (each request runs in a worker thread,
+    paced by a bucket shared by every fetch on that client, so several
+    symbols backfilled at once split the limit). The caller owns the client
+    and closes an async one when done.
+    """
+    if not (start_date_str and end_date_str):
+        # Open-ended request: a single page, exactly like the sync version
+        return await asyncio.to_thread(
+            fetch_historical_ohlcv.__wrapped__, exchange_obj, symbol, timeframe,
+            start_date_str, end_date_str, limit
+        )
+    
+    try:
+        symbol, since, until = _parse_ohlcv_request(
+            exchange_obj, symbol, timeframe, start_date_str, end_date_str
+        )
+        
+        # Every page start is known up front: `limit` candles per page
+        page_ms = exchange_obj.parse_timeframe(timeframe) * 1000 * limit
+        is_async_client = asyncio.iscoroutinefunction(exchange_obj.fetch_ohlcv)
+        
+        bucket = None if is_async_client else _rate_bucket(exchange_obj)
+        
+        async def fetch_page(page_since):
+            if is_async_client:
+                return await exchange_obj.fetch_ohlcv(symbol=symbol, timeframe=timeframe,
+                                                      since=page_since, limit=limit)
+            await bucket.acquire()
+            return await asyncio.to_thread(exchange_obj.fetch_ohlcv, symbol=symbol, timeframe=timeframe,
+                                           since=page_since, limit=limit)
+        
+        try:
+            pages = await asyncio.gather(
+                *(fetch_page(page_since) for page_since in range(since, until + 1, page_ms)),
+                return_exceptions=True
+            )
+            for page in pages:
+                if isinstance(page, BaseException):
+                    raise page
+            
+            # Copy each page straight into one preallocated float64 block
+            # rather than flattening every candle into a combined list
+            ohlcv = np.empty((sum(len(page) for page in pages), 6), dtype=np.float64)
+            if not len(ohlcv):
+                logger.warning(f"No data returned for {symbol}")
+                return None
+            offset = 0
+            for page in pages:
+                if page:
+                    ohlcv[offset:offset + len(page)] = page
+                    offset += len(page)
+            
+            # Pages can overlap at their edges
+            return _ohlcv_frame(ohlcv, until, dedupe=True)
             
         except ccxt.NetworkError as e:
             raise RetryableExchangeError(f"Network error fetching data: {e}")
@@ -442,7 +860,7 @@ def fetch_and_print_recent_trades(exchange, symbol: str, limit: int = 10):
         except ConfigValidationError as e:
             raise ExchangeError(f"Invalid symbol: {e}")
         
-        logger.info(f"📈 Fetching last {limit} trades for {symbol}")
+        logger.info("📈 Fetching last %s trades for %s", limit, symbol)
         
         try:
             trades = exchange.fetch_my_trades(symbol=symbol, limit=limit)
@@ -451,12 +869,16 @@ def fetch_and_print_recent_trades(exchange, symbol: str, limit: int = 10):
                 logger.info("No recent trades found")
                 return
             
-            logger.info(f"Recent {len(trades)} trades:")
-            for trade in trades[-limit:]:  # Show most recent
-                logger.info(
+            # The listing is only built when INFO records are actually emitted,
+            # and goes out as a single record
+            if logger.isEnabledFor(logging.INFO):
+                recent = itertools.islice(trades, max(len(trades) - limit, 0), None)  # Show most recent
+                lines = "\n".join(
                     f"  {trade['datetime']} - {trade['side'].upper()} "
-                    f"{trade['amount']} @ {trade['price']} (Fee: {trade.get('fee', {}).get('cost', 0)})"
+                    f"{trade['amount']} @ {trade['price']} (Fee: {(trade.get('fee') or {}).get('cost', 0)})"
+                    for trade in recent
                 )
+                logger.info("Recent %d trades:\n%s", len(trades), lines)
                 
         except ccxt.NetworkError as e:
             raise RetryableExchangeError(f"Network error fetching trades: {e}")
@@ -507,19 +929,32 @@ def check_exchange_health(exchange) -> Dict[str, Any]:
         
         health_status['connected'] = True
         
-        # Test market loading
-        try:
-            exchange.load_markets()
+        # Test market loading; markets the client already holds are not re-downloaded
+        probes = {}
+        if exchange.markets:
             health_status['markets_loaded'] = True
-        except Exception as e:
-            health_status['errors'].append(f"Markets not accessible: {e}")
+        else:
+            probes['markets_loaded'] = ("Markets", _health_probe_pool.submit(exchange.load_markets))
         
-        # Test balance access
-        try:
-            balance = exchange.fetch_balance()
+        # Test balance access (a recent successful fetch still counts)
+        checked_at = _balance_checked_at.get(id(exchange))
+        if checked_at is not None and time.monotonic() - checked_at < HEALTH_BALANCE_TTL:
             health_status['balance_accessible'] = True
-        except Exception as e:
-            health_status['errors'].append(f"Balance not accessible: {e}")
+        else:
+            probes['balance_accessible'] = ("Balance", _health_probe_pool.submit(_fetch_balance, exchange))
+        
+        deadline = time.monotonic() + HEALTH_PROBE_TIMEOUT
+        for key, (label, future) in probes.items():
+            try:
+                future.result(timeout=max(deadline - time.monotonic(), 0))
+                health_status[key] = True
+            except concurrent.futures.TimeoutError:
+                health_status['errors'].append(f"{label} not accessible: timed out after {HEALTH_PROBE_TIMEOUT:.0f}s")
+            except Exception as e:
+                health_status['errors'].append(f"{label} not accessible: {e}")
+        
+        if not health_status['balance_accessible']:
+            _balance_checked_at.pop(id(exchange), None)
         
     except Exception as e:
         health_status['errors'].append(f"Health check error: {e}")
@@ -6,15 +6,17 @@ import time
 import logging
 import signal
 import sys
+import concurrent.futures
+import ccxt
 from datetime import datetime, timedelta
 import pandas as pd
 from typing import Dict, Any
 
 from strategies import IchimokuTrend, RsiReversal
-from exchange_handler import initialize_exchange, execute_trade, fetch_historical_ohlcv
+from exchange_handler import initialize_exchange, execute_trade, fetch_historical_ohlcv, fetch_free_balance
 from state_manager import TradingStateManager, PositionManager
 from enhanced_state_manager import DashboardStateManager
-from config import Config
+from config import Config, ensure_initialized
 
 # Configure logging
 logging.basicConfig(
@@ -29,11 +31,16 @@ logger = logging.getLogger(__name__)
 
 class LiveTradingBot:
     def __init__(self):
+        ensure_initialized()
+        
         # Configuration
         self.exchange_name = Config.EXCHANGE_NAME
         self.symbol = "BTC/USDT"
         self.timeframe = "4h"
         self.check_interval = 300  # Check every 5 minutes
+        self.candle_close_delay = 2  # Seconds after a candle closes before fetching it
+        self.history_limit = 1000  # Closed candles kept in memory for the indicators
+        self.state_save_interval = 3600  # Save unchanged state at most hourly
         
         # Trading parameters from config
         self.trading_fee_rate = Config.TRADING_FEE_RATE
@@ -42,13 +49,22 @@ class LiveTradingBot:
         self.position_size_pct = Config.POSITION_SIZE_PCT  # 1.5% risk per trade
         
         # Initialize components
-        self.state_manager = TradingStateManager("live_bot_state.json")
-        self.dashboard_state = DashboardStateManager()
+        self.state_manager = TradingStateManager("live_bot_state.json", background_writes=True)
+        self.dashboard_state = DashboardStateManager(background_writes=True)
         self.position_manager = PositionManager()
         self.strategies = [IchimokuTrend(), RsiReversal()]
+        # (strategy, class name) pairs, named once instead of on every loop
+        self._strategy_pairs = tuple((s, s.__class__.__name__) for s in self.strategies)
+        self._pending_trades = []  # Trades from the current signal check, flushed together
+        self._candles = None  # Rolling window of closed candles from the exchange
+        self._last_signal_bar = None  # Open time of the last candle signals were checked on
+        self._state_dirty = False  # Positions changed since the last save
+        self._last_state_save = None  # time.monotonic() of the last successful save
         
         # Exchange connection
         self.exchange = None
+        self.balance = 0.0  # Free USDT, refreshed with every candle poll
+        self._balance_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="balance")
         self.running = False
         
         # Setup signal handlers for graceful shutdown (only works in main thread)
@@ -65,6 +81,9 @@ class LiveTradingBot:
         logger.info(f"Received signal {signum}. Shutting down gracefully...")
         self.running = False
         self.save_state()
+        self.state_manager.close()  # Make sure the final snapshot reaches disk
+        self.dashboard_state.close()  # ...and queued dashboard rows reach the database
+        self._balance_pool.shutdown(wait=False, cancel_futures=True)
         # Only exit if running as standalone script
         if __name__ == "__main__":
             sys.exit(0)
@@ -74,6 +93,9 @@ class LiveTradingBot:
         logger.info("Stopping bot via Streamlit interface...")
         self.running = False
         self.save_state()
+        self.state_manager.flush()
+        self.dashboard_state.flush_db()
+        self._balance_pool.shutdown(wait=False, cancel_futures=True)
     
     def initialize(self):
         """Initialize exchange and restore state"""
@@ -108,6 +130,8 @@ class LiveTradingBot:
             self.exchange = None
             balance = 4000.0  # Mock balance
         
+        self.balance = balance
+        
         # Restore previous state
         self.restore_state()
         
@@ -131,8 +155,7 @@ class LiveTradingBot:
             
             # Restore strategy states
             strategy_states = self.state_manager.get_strategy_states(saved_state)
-            for strategy in self.strategies:
-                strategy_name = strategy.__class__.__name__
+            for strategy, strategy_name in self._strategy_pairs:
                 if strategy_name in strategy_states:
                     # Restore strategy-specific state if needed
                     logger.info(f"Restored state for {strategy_name}")
@@ -146,35 +169,59 @@ class LiveTradingBot:
         """Save current bot state"""
         try:
             # Prepare strategy states
+            now_iso = datetime.now().isoformat()
             strategy_states = {}
-            for strategy in self.strategies:
-                strategy_name = strategy.__class__.__name__
+            for strategy, strategy_name in self._strategy_pairs:
                 strategy_states[strategy_name] = {
-                    "last_update": datetime.now().isoformat()
+                    "last_update": now_iso
                     # Add more strategy-specific state as needed
                 }
             
             # Save state
-            self.state_manager.save_state(
+            if self.state_manager.save_state(
                 positions=self.position_manager.positions,
                 strategy_states=strategy_states,
-                last_processed_timestamp=datetime.now().isoformat(),
+                last_processed_timestamp=now_iso,
                 equity_history={},  # Could track equity over time
                 trade_history=[]    # Could track recent trades
-            )
+            ):
+                self._state_dirty = False
+                self._last_state_save = time.monotonic()
             logger.info("State saved successfully")
             
         except Exception as e:
             logger.error(f"Failed to save state: {e}")
     
     def fetch_latest_data(self, lookback_hours: int = 200) -> pd.DataFrame:
-        """Fetch latest market data"""
+        """
+        Fetch latest market data
+        
+        With an exchange, the full history is downloaded once and then kept as
+        a rolling window of closed candles: later calls only request the
+        candles since the last one held and append those that have closed.
+        """
         try:
             # If exchange is not available, generate mock data
             if self.exchange is None:
                 logger.info("Exchange not available, generating mock data")
                 return self._generate_mock_data(lookback_hours)
             
+            if self._candles is not None:
+                # The balance request runs alongside the candle request, so the
+                # poll takes one round-trip rather than two
+                balance_future = self._balance_pool.submit(fetch_free_balance, self.exchange)
+                try:
+                    return self._update_candles()
+                except Exception as e:
+                    # Keep trading on the candles already held rather than mock data
+                    logger.error(f"Error fetching new candles: {e}")
+                    return self._candles
+                finally:
+                    try:
+                        self.balance = balance_future.result()
+                    except Exception as e:
+                        logger.warning(f"Could not refresh balance, keeping {self.balance:.2f}: {e}")
+            
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=lookback_hours)
             
@@ -186,10 +233,12 @@ class LiveTradingBot:
                 end_date_str=end_time.strftime("%Y-%m-%d %H:%M:%S")
             )
             
+            df = self._closed_candles(df)
             if df is not None and not df.empty:
                 # Precompute indicators
                 for strategy in self.strategies:
                     strategy.precompute_indicators(df)
+                self._candles = df
                 
                 logger.info(f"Fetched {len(df)} candles. Latest price: ${df['close'].iloc[-1]:.2f}")
                 return df
@@ -201,6 +250,39 @@ class LiveTradingBot:
             logger.error(f"Error fetching data: {e}, falling back to mock data")
             return self._generate_mock_data(lookback_hours)
     
+    def _closed_candles(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Drop the candle that is still forming (index holds UTC open times)"""
+        if df is None or df.empty:
+            return df
+        now = pd.Timestamp(time.time(), unit='s')
+        candle_length = pd.Timedelta(seconds=ccxt.Exchange.parse_timeframe(self.timeframe))
+        return df[df.index + candle_length <= now]
+    
+    def _update_candles(self) -> pd.DataFrame:
+        """Append newly closed candles to the rolling window"""
+        last_open = self._candles.index[-1]
+        recent = fetch_historical_ohlcv(
+            exchange_obj=self.exchange,
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            # From the last candle held (same timestamp format as the warm-up fetch),
+            # so the response is just that candle and any newer ones
+            start_date_str=last_open.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        recent = self._closed_candles(recent)
+        if recent is None or recent.empty or recent.index[-1] <= last_open:
+            return self._candles
+        
+        new = recent.loc[recent.index > last_open, ['open', 'high', 'low', 'close', 'volume']]
+        df = pd.concat([self._candles, new]).iloc[-self.history_limit:]
+        # Only the indicator rows the new candles can change are recomputed
+        for strategy in self.strategies:
+            strategy.update_indicators(df, len(new))
+        self._candles = df
+        
+        logger.info(f"New candle closed at {df.index[-1]}. Price: ${df['close'].iloc[-1]:.2f}")
+        return df
+    
     def _generate_mock_data(self, lookback_hours: int = 200) -> pd.DataFrame:
         """Generate mock market data for testing"""
         import numpy as np
@@ -244,24 +326,23 @@ class LiveTradingBot:
         prices = np.maximum(prices, base_price * 0.5)
         
         # Create OHLCV data
-        data = []
-        for i, (timestamp, close) in enumerate(zip(timestamps, prices)):
-            # Generate realistic OHLC from close price
-            daily_volatility = close * 0.015  # 1.5% daily volatility
-            high = close + np.random.uniform(0, daily_volatility)
-            low = close - np.random.uniform(0, daily_volatility)
-            open_price = close + np.random.uniform(-daily_volatility/2, daily_volatility/2)
-            volume = np.random.uniform(100, 1000)
-            
-            data.append({
-                'open': open_price,
-                'high': max(open_price, high, close),
-                'low': min(open_price, low, close),
-                'close': close,
-                'volume': volume
-            })
+        # Draw every bar's high/low/open/volume uniforms in one call; row-major
+        # order keeps the same per-bar draw sequence as four np.random.uniform calls
+        daily_volatility = prices * 0.015  # 1.5% daily volatility
+        u = np.random.random_sample((len(prices), 4))
+        high = prices + daily_volatility * u[:, 0]
+        low = prices - daily_volatility * u[:, 1]
+        open_price = prices + (-daily_volatility/2 + daily_volatility * u[:, 2])
+        volume = 100 + (1000 - 100) * u[:, 3]
         
-        df = pd.DataFrame(data, index=timestamps)
+        # Generate realistic OHLC from close price, building the frame once
+        df = pd.DataFrame({
+            'open': open_price,
+            'high': np.maximum(np.maximum(open_price, high), prices),
+            'low': np.minimum(np.minimum(open_price, low), prices),
+            'close': prices,
+            'volume': volume
+        }, index=timestamps)
         
         # Precompute indicators
         for strategy in self.strategies:
@@ -277,6 +358,9 @@ class LiveTradingBot:
             return
         
         latest_row = df.iloc[-1]
+        if latest_row.name == self._last_signal_bar:
+            return  # Signals were already checked on this candle
+        self._last_signal_bar = latest_row.name
         current_price = latest_row['close']
         current_time = latest_row.name.isoformat()
         
@@ -285,14 +369,19 @@ class LiveTradingBot:
         # Update unrealized P&L for open positions
         self.position_manager.update_unrealized_pnl({self.symbol: float(current_price)})
         
-        for strategy in self.strategies:
-            strategy_name = strategy.__class__.__name__
+        # One pass over the positions for every strategy's lookup below
+        open_by_key = self.position_manager.open_positions_by_key()
+        symbol = self.symbol.upper()
+        if any(key[0] == symbol for key in open_by_key):
+            self._state_dirty = True
+        
+        for strategy, strategy_name in self._strategy_pairs:
             
             try:
                 # Check if we already have a position for this strategy
-                has_position = self.position_manager.has_position(self.symbol, strategy_name)
+                open_positions = open_by_key.get((symbol, strategy_name))
                 
-                if not has_position:
+                if not open_positions:
                     # Check for entry signal
                     signal = strategy.entry_signal(latest_row.name, df)
                     
@@ -301,8 +390,6 @@ class LiveTradingBot:
                 
                 else:
                     # Check for exit signal
-                    open_positions = self.position_manager.get_open_positions(self.symbol, strategy_name)
-                    
                     for pos_id, position in open_positions.items():
                         should_exit = strategy.exit_signal(latest_row.name, df, position['entry_price'])
                         
@@ -311,16 +398,26 @@ class LiveTradingBot:
                             
             except Exception as e:
                 logger.error(f"Error processing {strategy_name}: {e}")
+        
+        self.flush_trades()
+    
+    def flush_trades(self):
+        """Log the trades made during this signal check and persist state once"""
+        if not self._pending_trades:
+            return
+        trades, self._pending_trades = self._pending_trades, []
+        self.dashboard_state.log_trade(trades)  # One batch insert
+        self.save_state()  # One state write for all trades in this check
     
     def execute_entry_trade(self, strategy_name: str, price: float, timestamp: str, row: pd.Series):
         """Execute entry trade"""
         try:
             # Calculate position size based on ATR risk
-            if pd.notna(row.get('ATR')) and row['ATR'] > 0:
-                risk = row['ATR']
+            # One lookup; a missing or NaN ATR compares False, no separate notna check needed
+            atr = row.get('ATR', 0.0)
+            if atr > 0:
                 # Use a portion of available balance (simplified)
-                available_balance = 4000  # This should come from actual balance
-                position_value = available_balance * self.position_size_pct
+                position_value = self.balance * self.position_size_pct
                 quantity = position_value / price
                 
                 logger.info(f"ENTRY SIGNAL: {strategy_name} BUY {quantity:.6f} {self.symbol} at ${price:.2f}")
@@ -357,7 +454,7 @@ class LiveTradingBot:
                         entry_time=timestamp
                     )
                     
-                    # Log trade to dashboard
+                    # Queue trade for the dashboard; flushed after all strategies are checked
                     trade_data = {
                         'symbol': self.symbol,
                         'strategy': strategy_name,
@@ -367,10 +464,9 @@ class LiveTradingBot:
                         'timestamp': timestamp,
                         'position_id': pos_id
                     }
-                    self.dashboard_state.log_trade(trade_data)
+                    self._pending_trades.append(trade_data)
                     
                     logger.info(f"✅ Position opened: {pos_id}")
-                    self.save_state()  # Save state after trade
                 else:
                     logger.error("Failed to execute entry trade")
                     
@@ -411,7 +507,7 @@ class LiveTradingBot:
                 # Close position
                 pnl = self.position_manager.close_position(pos_id, price, timestamp)
                 
-                # Log trade to dashboard
+                # Queue trade for the dashboard; flushed after all strategies are checked
                 trade_data = {
                     'symbol': self.symbol,
                     'strategy': strategy_name,
@@ -422,10 +518,9 @@ class LiveTradingBot:
                     'position_id': pos_id,
                     'pnl': pnl
                 }
-                self.dashboard_state.log_trade(trade_data)
+                self._pending_trades.append(trade_data)
                 
                 logger.info(f"✅ Position closed: {pos_id}, P&L: ${pnl:.2f}")
-                self.save_state()  # Save state after trade
             else:
                 logger.error("Failed to execute exit trade")
                 
@@ -471,6 +566,7 @@ class LiveTradingBot:
         self.running = True
         
         while self.running:
+            loop_start = time.monotonic()
             try:
                 # Fetch latest data
                 df = self.fetch_latest_data()
@@ -493,12 +589,20 @@ class LiveTradingBot:
                     active_connections=len(self.position_manager.get_open_positions())
                 )
                 
-                # Save state periodically
-                self.save_state()
+                # Save state when it changed, otherwise only every state_save_interval
+                if (self._state_dirty or self._last_state_save is None
+                        or time.monotonic() - self._last_state_save >= self.state_save_interval):
+                    self.save_state()
                 
-                # Wait before next check
-                logger.info(f"Waiting {self.check_interval} seconds until next check...")
-                time.sleep(self.check_interval)
+                # Wait before next check: check_interval from the start of this
+                # iteration (so the loop's own run time doesn't add drift), or
+                # until just after the current candle closes if that is sooner
+                candle_seconds = ccxt.Exchange.parse_timeframe(self.timeframe)
+                now = time.time()
+                until_close = (now // candle_seconds + 1) * candle_seconds + self.candle_close_delay - now
+                wait = max(0.0, min(loop_start + self.check_interval - time.monotonic(), until_close))
+                logger.info(f"Waiting {wait:.0f} seconds until next check...")
+                time.sleep(wait)
                 
             except KeyboardInterrupt:
                 logger.info("Received keyboard interrupt")
@@ -507,6 +611,8 @@ class LiveTradingBot:
                 logger.error(f"Error in main loop: {e}")
                 time.sleep(60)  # Wait 1 minute before retrying
         
+        self.state_manager.flush()
+        self.dashboard_state.flush_db()
         logger.info("Bot stopped")
 
 if __name__ == "__main__":
@@ -18,7 +18,7 @@ from engines.backtest import run
 from exchange_handler import initialize_exchange, execute_trade, fetch_and_print_recent_trades, fetch_historical_ohlcv
 
 # Import configuration and components
-from config import Config, DEFAULT_CSV_DATA, EQUITY_CURVE_CSV
+from config import Config, DEFAULT_CSV_DATA, EQUITY_CURVE_CSV, OHLCV_CACHE_DIR
 
 # --- Configuration ---
 TARGET_EXCHANGE = "bybit"  # Options: "bybit", "alpaca"
@@ -81,7 +81,8 @@ if FETCH_DATA_FROM_EXCHANGE and exchange and TRADING_SYMBOL:
         symbol=TRADING_SYMBOL,
         timeframe=DATA_TIMEFRAME,
         start_date_str=start_date_str,
-        end_date_str=end_date_str
+        end_date_str=end_date_str,
+        cache_dir=OHLCV_CACHE_DIR
     )
     if fetched_df is not None and not fetched_df.empty:
         df = fetched_df
@@ -136,7 +137,8 @@ if not (FETCH_DATA_FROM_EXCHANGE and fetched_df is not None and not fetched_df.e
     if start_date_str:
         try:
             start_date = pd.to_datetime(start_date_str)
-            df = df[df.index >= start_date]
+            # CSV data is sorted above, so a binary search replaces the full boolean mask
+            df = df.iloc[df.index.searchsorted(start_date, side='left'):]
             print(f"Filtered CSV data from start_date: {start_date_str}. Shape after start_date: {df.shape}")
         except Exception as e:
             print(f"Warning: Could not parse start_date '{start_date_str}' for CSV: {e}. Using all data from the beginning of CSV.")
@@ -149,7 +151,7 @@ if not (FETCH_DATA_FROM_EXCHANGE and fetched_df is not None and not fetched_df.e
                 end_date_filter = end_date + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
             else:
                 end_date_filter = end_date
-            df = df[df.index <= end_date_filter]
+            df = df.iloc[:df.index.searchsorted(end_date_filter, side='right')]
             print(f"Filtered CSV data up to end_date: {end_date_str}. Shape after end_date: {df.shape}")
         except Exception as e:
             print(f"Warning: Could not parse end_date '{end_date_str}' for CSV: {e}. Using all data up to the end of CSV.")
@@ -271,7 +273,7 @@ else:
 # Precompute indicators for all strategies on the main df so plot_results can access them
 print("Precomputing indicators for plotting...")
 for strat_instance in strats:
-    strat_instance.precompute_indicators(df) 
+    strat_instance.attach_indicators(df)  # Cached, so run() below reuses these columns
     # This makes sure df has 'tenkan', 'kijun', 'ssa', 'ssb', 'chikou', 'RSI', 'ATR' before plotting
     # Need to make KIJUN accessible for Chikou plot, or pass it. For now, let's try to get it from the IchimokuTrend instance.
     if isinstance(strat_instance, IchimokuTrend):
@@ -296,7 +298,8 @@ equity = run(
     trading_fee_rate=TRADING_FEE_RATE,
     slippage_rate=SLIPPAGE_RATE,
     min_profit_threshold=MIN_PROFIT_THRESHOLD,
-    enable_realistic_costs=ENABLE_REALISTIC_COSTS
+    enable_realistic_costs=ENABLE_REALISTIC_COSTS,
+    verbose=True  # List every simulated trade
 )
 equity.to_csv(EQUITY_CURVE_CSV)
 # The print statement from backtest.py will show detailed totals
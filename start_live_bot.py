@@ -5,9 +5,10 @@ Simple startup script for the live trading bot
 import os
 import sys
 from pathlib import Path
-from config import Config
+from config import Config, ensure_initialized
 
 def main():
+    ensure_initialized()
     print("🚀 Starting Live Trading Bot with State Persistence")
     print("=" * 60)
     
@@ -21,7 +22,7 @@ def main():
     
     missing_files = []
     for file in required_files:
-        if not Path(file).exists():
+        if not os.path.exists(file):
             missing_files.append(file)
     
     if missing_files:
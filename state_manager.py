@@ -4,6 +4,7 @@ Saves and restores bot state to prevent data loss on restart
 Implements atomic writes to prevent corruption
 """
 import json
+import numpy as np
 import pandas as pd
 import tempfile
 import shutil
@@ -14,17 +15,75 @@ from typing import Dict, Any, Optional
 import logging
 import time
 import threading
+import queue
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional: without it snapshots are encoded with the stdlib json module
+    orjson = None
+
+def _json_default(value: Any) -> str:
+    """Stdlib fallback matching orjson: plain datetimes as ISO 8601, anything else via str()"""
+    if type(value) is datetime:
+        return value.isoformat()
+    return str(value)
+
+def _dump_state(state: Dict[str, Any]) -> bytes:
+    """Encode a state snapshot as indented JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(
+            state,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(state, indent=2, default=_json_default).encode()
+
+def _load_state(data: bytes) -> Any:
+    """Decode a state file written by _dump_state"""
+    if orjson is not None:
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(data)
+
+def _state_checksum(state: Dict[str, Any]) -> int:
+    """Stable 8-digit checksum over a state snapshot, excluding its checksum field"""
+    body = {k: v for k, v in state.items() if k != "checksum"}
+    if orjson is not None:
+        encoded = orjson.dumps(
+            body,
+            default=str,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    else:
+        encoded = json.dumps(body, sort_keys=True, default=_json_default).encode()
+    return zlib.crc32(encoded) % (10 ** 8)
+
+# Queue sentinel telling the background writer to exit
+_STOP_WRITER = object()
 
 class StateCorruptionError(Exception):
     """Raised when state file is corrupted"""
     pass
 
 class TradingStateManager:
-    def __init__(self, state_file: str = "bot_state.json"):
+    def __init__(self, state_file: str = "bot_state.json", background_writes: bool = False):
         self.state_file = Path(state_file)
         self.logger = logging.getLogger(__name__)
         self._lock = threading.Lock()  # Thread safety for concurrent access
         
+        # Optional writer thread: save_state encodes the snapshot and queues it,
+        # the disk I/O (backup copy, fsync, rename) happens off the caller's thread
+        self._queue = None
+        self._writer = None
+        if background_writes:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._writer_loop, args=(self._queue,),
+                name="state-writer", daemon=True
+            )
+            self._writer.start()
+        
     def save_state(self, 
                    positions: Dict[str, Any],
                    strategy_states: Dict[str, Any],
@@ -32,11 +91,15 @@ class TradingStateManager:
                    equity_history: Dict[str, float],
                    trade_history: list,
                    **kwargs) -> bool:
-        """Save complete bot state to file using atomic writes"""
+        """
+        Save complete bot state to file using atomic writes.
+        With background_writes the snapshot is queued for the writer thread
+        and True means it was queued; write failures are logged there.
+        """
         with self._lock:  # Ensure thread safety
             try:
                 state = {
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": datetime.now(),  # Formatted to ISO 8601 by the encoder
                     "positions": positions,
                     "strategy_states": strategy_states,
                     "last_processed_timestamp": last_processed_timestamp,
@@ -48,51 +111,97 @@ class TradingStateManager:
                 }
                 
                 # Calculate simple checksum for integrity verification
-                state_str = json.dumps(state, sort_keys=True, default=str)
-                state["checksum"] = hash(state_str) % (10 ** 8)  # Simple 8-digit checksum
+                state["checksum"] = _state_checksum(state)  # Simple 8-digit checksum
                 
-                # Create backup of existing state before writing new one
-                if self.state_file.exists():
-                    backup_file = self.state_file.with_suffix('.backup.json')
-                    try:
-                        shutil.copy2(self.state_file, backup_file)
-                        self.logger.debug(f"Created backup: {backup_file}")
-                    except Exception as backup_e:
-                        self.logger.warning(f"Failed to create backup: {backup_e}")
-                
-                # Atomic write: write to temporary file then rename
-                temp_file = None
-                try:
-                    with tempfile.NamedTemporaryFile(
-                        mode='w', 
-                        dir=self.state_file.parent,
-                        prefix=f".{self.state_file.stem}_tmp_",
-                        suffix='.json',
-                        delete=False
-                    ) as temp_file:
-                        json.dump(state, temp_file, indent=2, default=str)
-                        temp_file.flush()
-                        os.fsync(temp_file.fileno())  # Force write to disk
-                    
-                    # Atomic rename (this is atomic on most filesystems)
-                    shutil.move(temp_file.name, self.state_file)
-                    
-                    self.logger.info(f"State saved successfully to {self.state_file}")
+                # Encoding here snapshots the caller's (mutable) dicts
+                data = _dump_state(state)
+                if self._queue is not None:
+                    self._queue.put(data)
                     return True
-                    
-                except Exception as write_e:
-                    # Clean up temporary file if it exists
-                    if temp_file and Path(temp_file.name).exists():
-                        try:
-                            os.unlink(temp_file.name)
-                        except:
-                            pass
-                    raise write_e
+                
+                self._write_state(data)
+                return True
                 
             except Exception as e:
                 self.logger.error(f"Failed to save state: {e}")
                 return False
     
+    def _write_state(self, data: bytes) -> None:
+        """Back up the current state file, then atomically replace it (caller holds the lock)"""
+        # Create backup of existing state before writing new one
+        if self.state_file.exists():
+            backup_file = self.state_file.with_suffix('.backup.json')
+            try:
+                shutil.copy2(self.state_file, backup_file)
+                self.logger.debug(f"Created backup: {backup_file}")
+            except Exception as backup_e:
+                self.logger.warning(f"Failed to create backup: {backup_e}")
+        
+        # Atomic write: write to temporary file then rename
+        temp_file = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                mode='wb', 
+                dir=self.state_file.parent,
+                prefix=f".{self.state_file.stem}_tmp_",
+                suffix='.json',
+                delete=False
+            ) as temp_file:
+                temp_file.write(data)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())  # Force write to disk
+            
+            # Atomic rename (this is atomic on most filesystems)
+            shutil.move(temp_file.name, self.state_file)
+            
+            self.logger.info(f"State saved successfully to {self.state_file}")
+            
+        except Exception as write_e:
+            # Clean up temporary file if it exists
+            if temp_file and Path(temp_file.name).exists():
+                try:
+                    os.unlink(temp_file.name)
+                except:
+                    pass
+            raise write_e
+    
+    def _writer_loop(self, pending: queue.Queue):
+        """Write queued snapshots; when writes fall behind only the newest is written"""
+        stop = False
+        while not stop:
+            items = [pending.get()]
+            while True:
+                try:
+                    items.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = _STOP_WRITER in items
+            snapshots = [item for item in items if item is not _STOP_WRITER]
+            if snapshots:
+                with self._lock:
+                    try:
+                        self._write_state(snapshots[-1])
+                    except Exception as e:
+                        self.logger.error(f"Failed to save state: {e}")
+            
+            for _ in items:
+                pending.task_done()
+    
+    def flush(self):
+        """Block until every queued snapshot has been written"""
+        pending = self._queue
+        if pending is not None:
+            pending.join()
+    
+    def close(self):
+        """Write any queued snapshot and stop the writer thread; later saves are synchronous"""
+        with self._lock:
+            pending, self._queue = self._queue, None
+        if pending is not None:
+            pending.put(_STOP_WRITER)
+            self._writer.join()
+    
     def load_state(self) -> Optional[Dict[str, Any]]:
         """Load bot state from file with integrity checking"""
         with self._lock:  # Ensure thread safety
@@ -129,8 +238,8 @@ class TradingStateManager:
     def _load_and_validate_state_file(self, file_path: Path) -> Optional[Dict[str, Any]]:
         """Load and validate a state file"""
         try:
-            with open(file_path, 'r') as f:
-                state = json.load(f)
+            with open(file_path, 'rb') as f:
+                state = _load_state(f.read())
             
             # Basic validation
             if not isinstance(state, dict):
@@ -143,9 +252,8 @@ class TradingStateManager:
             
             # Checksum validation (if available)
             if 'checksum' in state:
-                stored_checksum = state.pop('checksum')
-                calculated_checksum = hash(json.dumps(state, sort_keys=True, default=str)) % (10 ** 8)
-                state['checksum'] = stored_checksum  # Restore for return
+                stored_checksum = state['checksum']
+                calculated_checksum = _state_checksum(state)
                 
                 if stored_checksum != calculated_checksum:
                     self.logger.warning(f"Checksum mismatch in {file_path} (stored: {stored_checksum}, calculated: {calculated_checksum})")
@@ -304,6 +412,27 @@ class PositionManager:
             self.logger.error(f"Failed to get open positions: {e}")
             return {}
     
+    def open_positions_by_key(self) -> Dict[tuple, Dict]:
+        """Open positions grouped by (symbol, strategy), built in one pass"""
+        grouped = {}
+        for pos_id, pos in self.positions.items():
+            if pos["status"] == "open":
+                grouped.setdefault((pos["symbol"], pos["strategy"]), {})[pos_id] = pos
+        return grouped
+    
+    def positions_as_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Open positions as parallel arrays (one entry per position):
+        strategy and symbol (object), quantity and unrealized P&L (float64)
+        """
+        open_pos = list(self.get_open_positions().values())
+        return {
+            "strategy": np.array([pos.get("strategy", "") for pos in open_pos], dtype=object),
+            "symbol": np.array([pos.get("symbol", "") for pos in open_pos], dtype=object),
+            "quantity": np.array([pos.get("quantity", 0) for pos in open_pos], dtype=np.float64),
+            "unrealized": np.array([pos.get("unrealized_pnl", 0) for pos in open_pos], dtype=np.float64),
+        }
+    
     def has_position(self, symbol: str, strategy: str) -> bool:
         """Check if we have an open position for symbol/strategy"""
         try:
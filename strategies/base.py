@@ -1,16 +1,29 @@
-
 """
 Base classes and shared helpers for strategy modules.
 """
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import numpy as np
 import pandas as pd
 
+# Price data attach_indicators keys its cache on, and how many distinct
+# frames each strategy remembers
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+INDICATOR_CACHE_SIZE = 4
+
 class Strategy(ABC):
     """
     Abstract base class every strategy must inherit from.
     Each strategy works on its own capital slice.
     """
+    # Bars of history an indicator value depends on, and how many earlier
+    # bars a newly appended one can still change (forward-looking columns);
+    # used by update_indicators, 0 lookback means "recompute everything"
+    indicator_lookback = 0
+    indicator_lead = 0
+
     def __init__(self, slice_name: str, allocation: float):
         self.slice = slice_name
         self.allocation = allocation    # 0–1 fraction of total equity
@@ -22,6 +35,90 @@ class Strategy(ABC):
         """Add any indicator columns to df *in‑place* before run."""
         pass
 
+    def attach_indicators(self, df: pd.DataFrame) -> None:
+        """
+        precompute_indicators, memoised: when df has the same index and price
+        columns as a recent call, the indicator columns computed then are
+        copied in instead of recomputed. Assumes indicators depend only on
+        the index and PRICE_COLUMNS.
+        """
+        price_cols = [c for c in PRICE_COLUMNS if c in df.columns]
+        index_values = df.index.to_numpy()
+        if index_values.dtype == object:
+            # No stable bytes to key on
+            self.precompute_indicators(df)
+            return
+
+        digest = hashlib.blake2b(index_values.tobytes(), digest_size=16)
+        for c in price_cols:
+            digest.update(df[c].to_numpy(dtype=np.float64).tobytes())
+        key = digest.digest()
+
+        cache = self.__dict__.setdefault("_indicator_cache", OrderedDict())
+        columns = cache.get(key)
+        if columns is None:
+            # Computed on the bare prices, so only this strategy's columns come back
+            work = df[price_cols].copy()
+            self.precompute_indicators(work)
+            columns = {c: work[c].to_numpy() for c in work.columns if c not in price_cols}
+            cache[key] = columns
+            if len(cache) > INDICATOR_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+
+        for c, values in columns.items():
+            df[c] = values.copy()  # The cached arrays must not alias df
+
+    def update_indicators(self, df: pd.DataFrame, new_rows: int) -> None:
+        """
+        Refresh the indicator columns in-place after new_rows bars were appended
+        to a df that already had them. Only the bars the new ones can affect are
+        recomputed, from a tail slice just long enough for indicator_lookback.
+        """
+        first = len(df) - new_rows - self.indicator_lead
+        start = first - self.indicator_lookback
+        if not self.indicator_lookback or start <= 0:
+            self.precompute_indicators(df)
+            return
+
+        tail = df.iloc[start:].copy()
+        self.precompute_indicators(tail)
+        if not tail.columns.isin(df.columns).all():
+            # Indicators never computed on df: nothing to extend
+            self.precompute_indicators(df)
+            return
+        df.iloc[first:, df.columns.get_indexer(tail.columns)] = tail.iloc[first - start:].to_numpy()
+
+    def precompute_signals(self, df: pd.DataFrame) -> None:
+        """
+        Attach per-bar signal arrays aligned to df.index, used by the back-test engine:
+
+        entry_mask      – bool, True where entry_signal would fire
+        exit_mask       – bool, exits that do not depend on the entry price
+        stop_distance   – exit when close <= entry_price - stop_distance (NaN = unused)
+        target_distance – exit when close >= entry_price + target_distance (NaN = unused)
+
+        The default walks the scalar hooks bar by bar (price-dependent exits are
+        evaluated with a NaN entry price, so they never fire). Override with
+        column arithmetic for speed and to expose stops/targets.
+        """
+        n = len(df)
+        self.entry_mask = np.fromiter(
+            (bool(self.entry_signal(idx, df)) for idx in df.index), dtype=bool, count=n)
+        self.exit_mask = np.fromiter(
+            (bool(self.exit_signal(idx, df, np.nan)) for idx in df.index), dtype=bool, count=n)
+        self.stop_distance = np.full(n, np.nan)
+        self.target_distance = np.full(n, np.nan)
+
+    def compute_signals(self, df: pd.DataFrame):
+        """
+        Evaluate the signals for every bar once and return (entry_mask, exit_mask).
+        Needs precompute_indicators to have run; stop/target arrays stay on self.
+        """
+        self.precompute_signals(df)
+        return self.entry_mask, self.exit_mask
+
     @abstractmethod
     def entry_signal(self, idx: pd.Timestamp, df: pd.DataFrame) -> bool:
         """Return True when we want to enter long. Override in subclass."""
@@ -2,6 +2,7 @@
 Basis Cash-and-Carry Strategy
 Currently not implemented - placeholder for future development
 """
+import numpy as np
 from .base import Strategy
 
 class BasisCashCarryStrategy(Strategy):
@@ -21,6 +22,22 @@ class BasisCashCarryStrategy(Strategy):
         """Precompute any technical indicators needed"""
         # No indicators implemented yet
         pass
+
+    def precompute_signals(self, df):
+        """Columnar no-op signals, so the back-test engine skips the per-bar hook walk"""
+        n = len(df)
+        self.entry_mask = np.zeros(n, dtype=bool)
+        self.exit_mask = np.zeros(n, dtype=bool)
+        self.stop_distance = np.full(n, np.nan)
+        self.target_distance = np.full(n, np.nan)
+
+    def entry_signal(self, idx, df):
+        """Never enters until the strategy is implemented"""
+        return False
+
+    def exit_signal(self, idx, df, entry_price):
+        """Never exits until the strategy is implemented"""
+        return False
     
     def should_buy(self, symbol, current_data, position_manager):
         """Determine if we should enter a long position"""
@@ -1,4 +1,5 @@
 from __future__ import annotations
+from types import SimpleNamespace
 import numpy as np
 import pandas as pd
 from .base import Strategy
@@ -11,8 +12,16 @@ STOP_ATR_MULT = 2.5  # Wider stop loss
 MAX_POSITION_RISK = 0.02  # Maximum 2% risk per trade
 MAX_DRAWDOWN_LIMIT = 0.15  # Maximum 15% drawdown before stopping
 
+def _row(df: pd.DataFrame, idx) -> SimpleNamespace:
+    """Bar idx as plain Python scalars (r.close, r.tenkan, ...): converted once,
+    every field read after that is a cheap attribute lookup, not Series indexing"""
+    return SimpleNamespace(**dict(zip(df.columns, df.loc[idx].tolist())))
+
 class IchimokuTrend(Strategy):
     KIJUN = KIJUN_const
+    # Senkou B is a 52-bar range shifted forward by KIJUN; chikou looks KIJUN bars ahead
+    indicator_lookback = SENKOU_B + KIJUN_const
+    indicator_lead = KIJUN_const
 
     def __init__(self, allocation: float = 0.9):
         super().__init__("ICHIMOKU", allocation)
@@ -111,9 +120,46 @@ class IchimokuTrend(Strategy):
         
         return tenkan_kijun_cross or below_cloud or atr_stop or volatility_spike
 
+    def precompute_signals(self, df: pd.DataFrame) -> None:
+        """Column-wise equivalent of _long_entry_cond / _long_exit_cond (no drawdown filter)."""
+        close = df.close.to_numpy(dtype=float)
+        tenkan = df.tenkan.to_numpy(dtype=float)
+        kijun = df.kijun.to_numpy(dtype=float)
+        ssa = df.ssa.to_numpy(dtype=float)
+        ssb = df.ssb.to_numpy(dtype=float)
+        chikou = df.chikou.to_numpy(dtype=float)
+        atr = df.ATR.to_numpy(dtype=float)
+        vol_regime = df.volatility_regime.to_numpy(dtype=float)
+        trend_strength = df.trend_strength.to_numpy(dtype=float)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Same NaN behaviour as builtin max()/min() on (ssa, ssb)
+            cloud_top = np.where(ssb > ssa, ssb, ssa)
+            cloud_bottom = np.where(ssb < ssa, ssb, ssa)
+
+            tk_ready = ~(np.isnan(tenkan) | np.isnan(kijun))
+            ready = tk_ready & ~(np.isnan(ssa) | np.isnan(ssb) | np.isnan(chikou))
+
+            self.entry_mask = (
+                ready &
+                (tenkan > kijun) &
+                (close > cloud_top) &
+                (chikou > close) &
+                (ssa > ssb) &
+                (vol_regime < 0.9) &
+                (trend_strength > 2.0) &
+                (np.abs(ssa - ssb) / close > 0.005)
+            )
+            self.exit_mask = tk_ready & (
+                (tenkan < kijun) | (close < cloud_bottom) | (vol_regime > 0.95)
+            )
+
+        self.stop_distance = np.where(tk_ready, STOP_ATR_MULT * atr, np.nan)
+        self.target_distance = np.full(len(df), np.nan)
+
     # Interface implementations
     def entry_signal(self, idx, df):
-        return self._long_entry_cond(df.loc[idx])
+        return self._long_entry_cond(_row(df, idx))
 
     def exit_signal(self, idx, df, entry_price):
-        return self._long_exit_cond(df.loc[idx], entry_price)
+        return self._long_exit_cond(_row(df, idx), entry_price)
@@ -20,6 +20,8 @@ def compute_rsi(close: pd.Series, length: int = 14) -> pd.Series:
     return 100 - 100/(1+rs)
 
 class RsiReversal(Strategy):
+    indicator_lookback = TREND_FILTER_PERIOD  # The longest window (SMA_50)
+
     def __init__(self, allocation: float = 0.1):
         super().__init__("REVERSAL", allocation)
 
@@ -39,41 +41,73 @@ class RsiReversal(Strategy):
         # RSI momentum (rate of change)
         df["RSI_ROC"] = df["RSI"].diff(3)  # 3-period RSI change
 
+    def precompute_signals(self, df: pd.DataFrame) -> None:
+        """Column-wise equivalent of entry_signal / exit_signal."""
+        close = df.close.to_numpy(dtype=float)
+        rsi = df.RSI.to_numpy(dtype=float)
+        prev_rsi = df.RSI.shift().to_numpy(dtype=float)
+        rsi_roc = df.RSI_ROC.to_numpy(dtype=float)
+        sma = df.SMA_50.to_numpy(dtype=float)
+        atr = df.ATR.to_numpy(dtype=float)
+        recent_high = df.high.rolling(10).max().to_numpy(dtype=float)
+
+        with np.errstate(invalid="ignore"):
+            self.entry_mask = (
+                (np.arange(len(df)) >= 3) &  # Need at least 3 periods for RSI_ROC
+                (prev_rsi < OVERSOLD) & (rsi >= OVERSOLD) &
+                (rsi_roc > MIN_RSI_DIVERGENCE) &
+                (close >= sma * 0.98) &
+                (atr > 0) &
+                (close >= recent_high * 0.95)
+            )
+            self.exit_mask = (rsi >= OVERBOUGHT) | (close < sma * 0.95)
+
+        risk = STOP_ATR_MULT * atr
+        self.stop_distance = risk
+        self.target_distance = RR_TARGET * risk
+
     def entry_signal(self, idx, df):
-        if df.index.get_loc(idx) < 3:  # Need at least 3 periods for RSI_ROC
+        pos = df.index.get_loc(idx)
+        if pos < 3:  # Need at least 3 periods for RSI_ROC
             return False
-            
-        row = df.loc[idx]
-        prev_idx = df.index[df.index.get_loc(idx) - 1] if df.index.get_loc(idx) > 0 else idx
-        prev_row = df.loc[prev_idx]
+
+        # Positional scalar reads instead of materialising row Series
+        close = df.close.iat[pos]
+        rsi = df.RSI.iat[pos]
+        prev_rsi = df.RSI.iat[pos - 1]
         
         # Basic RSI reversal condition (more strict)
-        rsi_reversal = prev_row.RSI < OVERSOLD and row.RSI >= OVERSOLD
+        rsi_reversal = prev_rsi < OVERSOLD and rsi >= OVERSOLD
         
         # Additional filters to reduce trade frequency:
         
         # 1. RSI momentum filter - RSI should be recovering strongly
-        rsi_momentum_ok = row.RSI_ROC > MIN_RSI_DIVERGENCE
+        rsi_momentum_ok = df.RSI_ROC.iat[pos] > MIN_RSI_DIVERGENCE
         
         # 2. Trend filter - only trade reversals in overall uptrend or neutral
         # (price above or near 50-period MA)
-        trend_ok = row.close >= row.SMA_50 * 0.98  # Allow 2% below MA
+        trend_ok = close >= df.SMA_50.iat[pos] * 0.98  # Allow 2% below MA
         
         # 3. Volatility filter - only trade when ATR is reasonable
-        atr_ok = pd.notna(row.ATR) and row.ATR > 0
+        atr = df.ATR.iat[pos]
+        atr_ok = atr > 0  # NaN compares False, no separate missing-value check needed
         
         # 4. Price action filter - ensure we're not in a strong downtrend
-        # Check that current price is not significantly below recent high
-        recent_high = df.high.rolling(10).max().loc[idx]
-        price_action_ok = row.close >= recent_high * 0.95  # Within 5% of recent high
+        # Check that current price is not significantly below recent high.
+        # Only the 10-bar window ending at idx is needed, not a full rolling pass;
+        # NaN (too few bars or a gap in the window) fails the check like rolling(10) does.
+        window = df.high.to_numpy(dtype=float)[max(pos - 9, 0):pos + 1]
+        recent_high = window.max() if pos >= 9 else np.nan
+        price_action_ok = close >= recent_high * 0.95  # Within 5% of recent high
         
         return (rsi_reversal and rsi_momentum_ok and trend_ok and 
                 atr_ok and price_action_ok)
 
     def exit_signal(self, idx, df, entry_price):
         # More conservative exit with wider stops and lower targets
-        price = df.loc[idx].close
-        risk = STOP_ATR_MULT * df.loc[idx].ATR
+        pos = df.index.get_loc(idx)
+        price = df.close.iat[pos]
+        risk = STOP_ATR_MULT * df.ATR.iat[pos]
         
         # Exit conditions:
         # 1. Stop loss hit
@@ -83,9 +117,9 @@ class RsiReversal(Strategy):
         target_hit = price >= entry_price + RR_TARGET * risk
         
         # 3. RSI becomes overbought (take profits)
-        rsi_overbought = df.loc[idx].RSI >= OVERBOUGHT
+        rsi_overbought = df.RSI.iat[pos] >= OVERBOUGHT
         
         # 4. Trend turns negative (price falls below MA)
-        trend_negative = price < df.loc[idx].SMA_50 * 0.95
+        trend_negative = price < df.SMA_50.iat[pos] * 0.95
         
         return stop_hit or target_hit or rsi_overbought or trend_negative
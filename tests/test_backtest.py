@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Backtest Engine Tests
+Checks the vectorised signal arrays against the scalar strategy hooks
+"""
+
+import contextlib
+import io
+import os
+import unittest
+import unittest.mock
+
+import numpy as np
+import pandas as pd
+
+# Set test environment
+os.environ['TRADING_ENV'] = 'test'
+
+from strategies import IchimokuTrend, RsiReversal
+from strategies.basis import BasisCashCarryStrategy
+from engines.backtest import _last_valid, run
+from engines._backtest_kernel import run_kernel, BUY, SELL
+
+def make_ohlcv(n: int = 1500, seed: int = 7) -> pd.DataFrame:
+    """Synthetic trending/ranging 4h candles that trigger both strategies"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, n) + 0.01 * np.sin(np.linspace(0, 20, n))
+    close = 20000 * np.exp(np.cumsum(returns))
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + rng.uniform(0, 0.02, n)),
+        'low': close * (1 - rng.uniform(0, 0.02, n)),
+        'close': close,
+        'volume': 1.0,
+    }, index=pd.date_range('2022-01-01', periods=n, freq='4h'))
+
+class TestVectorisedSignals(unittest.TestCase):
+    """precompute_signals must agree with entry_signal/exit_signal bar by bar"""
+
+    def setUp(self):
+        self.df = make_ohlcv()
+        self.strategies = [IchimokuTrend(), RsiReversal()]
+        for s in self.strategies:
+            s.precompute_indicators(self.df)
+        self.signals = [s.compute_signals(self.df) for s in self.strategies]
+
+    def test_entry_mask_matches_scalar_hook(self):
+        for s in self.strategies:
+            expected = [bool(s.entry_signal(idx, self.df)) for idx in self.df.index]
+            self.assertTrue(np.array_equal(s.entry_mask, expected), s.slice)
+            self.assertTrue(s.entry_mask.any(), f"{s.slice} never enters on test data")
+
+    def test_compute_signals_returns_masks(self):
+        for s, (entry, exit_) in zip(self.strategies, self.signals):
+            self.assertIs(entry, s.entry_mask)
+            self.assertIs(exit_, s.exit_mask)
+            self.assertEqual(entry.shape, (len(self.df),))
+
+    def test_exit_arrays_match_scalar_hook(self):
+        close = self.df['close'].to_numpy()
+        for s in self.strategies:
+            for entry_price in (close.min(), float(np.median(close)), close.max()):
+                expected = [bool(s.exit_signal(idx, self.df, entry_price)) for idx in self.df.index]
+                actual = (s.exit_mask
+                          | (close <= entry_price - s.stop_distance)
+                          | (close >= entry_price + s.target_distance))
+                self.assertTrue(np.array_equal(actual, expected), s.slice)
+
+    def test_basis_placeholder_signals_are_columnar(self):
+        s = BasisCashCarryStrategy()
+        entry, exit_ = s.compute_signals(self.df)
+        self.assertEqual(entry.shape, (len(self.df),))
+        self.assertFalse(entry.any() or exit_.any())
+        self.assertTrue(np.isnan(s.stop_distance).all())
+
+class TestIncrementalIndicators(unittest.TestCase):
+    """update_indicators on appended bars must match a full recompute"""
+
+    def test_appended_bars_match_full_recompute(self):
+        full = make_ohlcv(400)
+        for s in (IchimokuTrend(), RsiReversal()):
+            expected = full.copy()
+            s.precompute_indicators(expected)
+
+            df = full.iloc[:380].copy()
+            s.precompute_indicators(df)
+            for start, stop in ((380, 381), (381, 390), (390, 400)):
+                df = pd.concat([df, full.iloc[start:stop]])
+                s.update_indicators(df, stop - start)
+            pd.testing.assert_frame_equal(df, expected, check_exact=False, rtol=1e-9)
+
+class TestAttachIndicators(unittest.TestCase):
+    """attach_indicators must match precompute_indicators and reuse repeat work"""
+
+    def test_repeat_frame_reuses_columns(self):
+        df = make_ohlcv(400)
+        for s in (IchimokuTrend(), RsiReversal()):
+            expected = df[['open', 'high', 'low', 'close', 'volume']].copy()
+            s.precompute_indicators(expected)
+
+            first = df.copy()
+            second = df.copy()
+            with unittest.mock.patch.object(s, 'precompute_indicators', wraps=s.precompute_indicators) as compute:
+                s.attach_indicators(first)
+                s.attach_indicators(second)
+                self.assertEqual(compute.call_count, 1)
+                pd.testing.assert_frame_equal(first, expected)
+                pd.testing.assert_frame_equal(second, expected)
+
+                # Different prices are a cache miss
+                changed = df.copy()
+                changed.iloc[-1, changed.columns.get_loc('close')] *= 1.01
+                s.attach_indicators(changed)
+                self.assertEqual(compute.call_count, 2)
+
+class TestEquityArray(unittest.TestCase):
+    """Final equity values are read positionally from the kernel output"""
+
+    def test_last_valid_per_column(self):
+        arr = np.array([[1.0, np.nan, np.nan],
+                        [2.0, 5.0, np.nan],
+                        [np.nan, 6.0, np.nan]])
+        np.testing.assert_array_equal(_last_valid(arr), [2.0, 6.0, np.nan])
+        self.assertTrue(np.isnan(_last_valid(np.empty((0, 2)))).all())
+
+class TestKernelPositions(unittest.TestCase):
+    """Per-strategy position state is held in flat arrays inside the kernel"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.k, self.n = 3, 400
+        self.close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, self.n)))
+        self.atr = np.full(self.n, 2.0)
+        self.entry_masks = rng.random((self.k, self.n)) < 0.1
+        self.exit_masks = rng.random((self.k, self.n)) < 0.1
+        self.start_cash = np.array([1000.0, 2000.0, 500.0])
+        nan = np.full((self.k, self.n), np.nan)
+        self.result = run_kernel(self.close, self.atr, self.entry_masks, self.exit_masks, nan, nan,
+                                 self.start_cash, 3500.0, 0.015, True, 0.001, 0.0005, 0.0)
+
+    def test_one_open_position_per_strategy(self):
+        _, _, trade_strat, trade_action, _, _, _, _ = self.result
+        for j in range(self.k):
+            actions = trade_action[trade_strat == j]
+            self.assertGreater(len(actions), 2)
+            expected = np.where(np.arange(len(actions)) % 2 == 0, BUY, SELL)
+            np.testing.assert_array_equal(actions, expected)
+
+    def test_trades_ordered_by_bar_then_strategy(self):
+        _, trade_bar, trade_strat, _, _, _, _, _ = self.result
+        order = np.lexsort((trade_strat, trade_bar))
+        np.testing.assert_array_equal(order, np.arange(len(trade_bar)))
+
+    def test_trade_buffers_fit_signal_extremes(self):
+        nan = np.full((self.k, self.n), np.nan)
+        always = np.ones((self.k, self.n), dtype=bool)
+        for entry_masks in (~always, always):
+            result = run_kernel(self.close, self.atr, entry_masks, always, nan, nan,
+                                self.start_cash, 3500.0, 0.015, False, 0.0, 0.0, 0.0)
+            self.assertEqual(len(result[1]), self.k * self.n if entry_masks.all() else 0)
+
+    def test_equity_is_cash_plus_marked_quantity(self):
+        equity, trade_bar, trade_strat, trade_action, trade_price, trade_qty, _, trade_fee = self.result
+        for j in range(self.k):
+            cash, qty = self.start_cash[j], 0.0
+            for action, price, units, fee in zip(trade_action[trade_strat == j], trade_price[trade_strat == j],
+                                                 trade_qty[trade_strat == j], trade_fee[trade_strat == j]):
+                if action == BUY:
+                    cash -= units * price + fee
+                    qty = units
+                else:
+                    cash += units * price - fee
+                    qty = 0.0
+            self.assertAlmostEqual(equity[-1, j], cash + qty * self.close[-1], places=6)
+        np.testing.assert_allclose(equity[:, -1], equity[:, :-1].sum(axis=1))
+
+class TestRun(unittest.TestCase):
+    """End-to-end run() behaviour"""
+
+    def _run(self, **kwargs):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            equity = run(make_ohlcv(), [IchimokuTrend(), RsiReversal()], initial_capital=4000, **kwargs)
+        return equity, out.getvalue()
+
+    def test_quiet_run_skips_trade_listing_only(self):
+        equity, loud = self._run(verbose=True)
+        quiet_equity, quiet = self._run()
+        pd.testing.assert_frame_equal(equity, quiet_equity)
+        self.assertIn(" - BUY  - ", loud)
+        self.assertNotIn(" - BUY  - ", quiet)
+        self.assertEqual(loud.split("--- Summary")[1], quiet.split("--- Summary")[1])
+
+if __name__ == "__main__":
+    unittest.main()
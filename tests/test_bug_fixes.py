@@ -7,12 +7,16 @@ Tests all the identified bugs and their fixes to ensure system reliability
 import os
 import sys
 import json
+import dataclasses
 import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 import logging
 
+import numpy as np
+import pandas as pd
+
 # Set test environment
 os.environ['TRADING_ENV'] = 'test'
 
@@ -79,6 +83,52 @@ class TestConfigValidation(unittest.TestCase):
         with self.assertRaises(ConfigValidationError):
             Config.sanitize_symbol('')  # Empty string
 
+    def test_validation_fingerprint_cache(self):
+        """Test cached validation skips only for a previously passing configuration"""
+        cache_file = Path(tempfile.mkdtemp()) / "config_fp"
+        keys = {'BYBIT_API_KEY': 'k' * 16, 'BYBIT_API_SECRET': 's' * 16}
+
+        with patch('config.VALIDATION_CACHE_FILE', cache_file), patch.dict(os.environ, keys):
+            self.assertTrue(Config.validate_config(use_cache=True))
+            self.assertEqual(cache_file.read_text(), Config._validation_fingerprint())
+
+            # Unchanged inputs: the checks are skipped entirely
+            invalid = dataclasses.replace(Config, INITIAL_CAPITAL=50)
+            with patch.object(type(Config), '_validation_fingerprint', return_value=cache_file.read_text()):
+                self.assertTrue(invalid.validate_config(use_cache=True))
+
+            # Changed inputs produce a new fingerprint and are validated again
+            with self.assertRaises(ConfigValidationError):
+                invalid.validate_config(use_cache=True)
+
+    def test_config_is_frozen(self):
+        """Test settings cannot be mutated after validation"""
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            Config.INITIAL_CAPITAL = 50
+        self.assertIs(Config(), Config)
+
+    def test_lazy_path_exports(self):
+        """Test path exports are strings and trigger one-time directory setup"""
+        import config
+        self.assertEqual(config.LOG_FILE, str(Config.LOG_FILE))
+        self.assertTrue(config._initialized)
+        with self.assertRaises(AttributeError):
+            config.NOT_A_SETTING
+
+    def test_entry_points_initialize_config(self):
+        """Test initialize_exchange sets up directories without a path export being read"""
+        import config
+        from exchange_handler import initialize_exchange
+        
+        with patch('config._initialized', False), \
+                patch.object(type(Config), 'ensure_directories') as ensure, \
+                patch.object(type(Config), 'validate_config'), \
+                patch.dict('exchange_handler._EXCHANGE_INITIALIZERS',
+                           {'bybit': MagicMock(return_value=(None, 0.0))}):
+            initialize_exchange("bybit")
+            initialize_exchange("bybit")
+            ensure.assert_called_once()
+
 class TestAtomicStateWrites(unittest.TestCase):
     """Test atomic state writing fixes"""
     
@@ -111,6 +161,7 @@ class TestAtomicStateWrites(unittest.TestCase):
         loaded_state = self.state_manager.load_state()
         self.assertIsNotNone(loaded_state)
         self.assertEqual(loaded_state['strategy_states']['test']['signal'], 'buy')
+        self.assertIn('T', loaded_state['timestamp'])  # ISO 8601 save time
     
     def test_backup_creation(self):
         """Test that backup files are created during updates"""
@@ -153,6 +204,56 @@ class TestAtomicStateWrites(unittest.TestCase):
         self.assertIsNotNone(loaded_state)
         self.assertTrue(loaded_state['strategy_states']['backup'])
 
+    def test_background_writes(self):
+        """Test queued snapshots are written by the writer thread"""
+        manager = TradingStateManager(str(self.state_file), background_writes=True)
+        positions = {"BTC": {"quantity": 1.0}}
+        for signal in ("buy", "sell"):
+            self.assertTrue(manager.save_state(
+                positions=positions, strategy_states={"test": {"signal": signal}},
+                last_processed_timestamp="", equity_history={}, trade_history=[]
+            ))
+        positions["BTC"]["quantity"] = 2.0  # Mutating after save must not leak into the snapshot
+        manager.close()
+        
+        loaded_state = manager.load_state()
+        self.assertEqual(loaded_state['strategy_states']['test']['signal'], 'sell')
+        self.assertEqual(loaded_state['positions']['BTC']['quantity'], 1.0)
+        
+        # After close saves fall back to synchronous writes
+        manager.save_state(positions={}, strategy_states={"closed": True}, last_processed_timestamp="",
+                           equity_history={}, trade_history=[])
+        self.assertTrue(manager.load_state()['strategy_states']['closed'])
+
+    def test_checksum_verifies_on_reload(self):
+        """Test a freshly saved state passes its checksum check"""
+        self.state_manager.save_state(
+            positions={"BTC": {"quantity": np.float64(0.5), "entry_time": pd.Timestamp("2024-01-01")}},
+            strategy_states={"test": {"signal": "buy"}}, last_processed_timestamp="",
+            equity_history={"2024-01-01": 4000.0}, trade_history=[]
+        )
+        
+        with patch.object(self.state_manager.logger, 'warning') as warning:
+            loaded_state = TradingStateManager(str(self.state_file)).load_state()
+        self.assertIsNotNone(loaded_state)
+        self.assertIn('checksum', loaded_state)
+        warning.assert_not_called()
+
+    def test_numpy_and_timestamp_values_saved(self):
+        """Test numpy scalars and timestamps in positions are serialized"""
+        result = self.state_manager.save_state(
+            positions={"BTC": {"quantity": np.float64(0.5), "bars": np.int64(3),
+                               "entry_time": pd.Timestamp("2024-01-01 10:00")}},
+            strategy_states={}, last_processed_timestamp="",
+            equity_history={}, trade_history=[]
+        )
+        
+        self.assertTrue(result)
+        position = self.state_manager.load_state()['positions']['BTC']
+        self.assertEqual(position['quantity'], 0.5)
+        self.assertEqual(int(position['bars']), 3)
+        self.assertEqual(pd.Timestamp(position['entry_time']), pd.Timestamp("2024-01-01 10:00"))
+
 class TestStrategyNamingConsistency(unittest.TestCase):
     """Test strategy naming consistency fixes"""
     
@@ -216,6 +317,243 @@ class TestStrategyNamingConsistency(unittest.TestCase):
             import shutil
             shutil.rmtree(temp_dir, ignore_errors=True)
 
+    def test_dashboard_trade_batch_logging(self):
+        """Test a batch of trades is stored in one call"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json")
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            dashboard.log_trade([
+                {'symbol': 'BTC/USDT', 'strategy': StrategyNames.ICHIMOKU_TREND, 'action': 'BUY',
+                 'quantity': 0.1, 'price': 45000},
+                {'symbol': 'BTC/USDT', 'strategy': StrategyNames.RSI_REVERSAL, 'action': 'SELL',
+                 'quantity': 0.1, 'price': 46000, 'pnl': 100.0},
+            ])
+            dashboard.log_trade([])
+            
+            import sqlite3
+            conn = sqlite3.connect(temp_db)
+            rows = conn.execute("SELECT strategy, action, pnl FROM trades ORDER BY id").fetchall()
+            conn.close()
+            
+            self.assertEqual(rows, [
+                (StrategyNames.ICHIMOKU_DB, 'BUY', 0),
+                (StrategyNames.REVERSAL_DB, 'SELL', 100.0),
+            ])
+            
+            # Large batches are split across several multi-row statements
+            dashboard.log_trade([
+                {'symbol': 'BTC/USDT', 'strategy': StrategyNames.ICHIMOKU_TREND, 'action': 'SELL',
+                 'quantity': 0.1, 'price': 45000, 'pnl': float(i)}
+                for i in range(500)
+            ])
+            conn = sqlite3.connect(temp_db)
+            pnls = [row[0] for row in conn.execute("SELECT pnl FROM trades ORDER BY id").fetchall()[2:]]
+            conn.close()
+            
+            self.assertEqual(pnls, [float(i) for i in range(500)])
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_dashboard_database_uses_wal(self):
+        """Test the dashboard database is switched to WAL journaling"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json")
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            import sqlite3
+            conn = sqlite3.connect(temp_db)
+            journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            conn.close()
+            
+            self.assertEqual(journal_mode, 'wal')
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_dashboard_connection_reused(self):
+        """Test dashboard writes share one connection per thread and path"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json")
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            conn = dashboard._get_conn()
+            dashboard.log_system_health()
+            self.assertIs(dashboard._get_conn(), conn)
+            
+            dashboard.close()
+            self.assertIsNot(dashboard._get_conn(), conn)
+            dashboard.close()
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_dashboard_background_writes(self):
+        """Test queued dashboard writes are committed by the writer thread"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json",
+                                              background_writes=True)
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            dashboard.log_trade({'timestamp': '2024-01-01T00:00:00', 'symbol': 'BTC/USDT',
+                                 'strategy': StrategyNames.ICHIMOKU_TREND, 'action': 'BUY',
+                                 'quantity': 0.1, 'price': 45000})
+            dashboard.log_system_health()
+            dashboard.flush_db()
+            
+            import sqlite3
+            conn = sqlite3.connect(temp_db)
+            trades = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+            last_trade_time = conn.execute("SELECT last_trade_time FROM system_health").fetchone()[0]
+            conn.close()
+            
+            self.assertEqual(trades, 1)
+            self.assertEqual(last_trade_time, '2024-01-01T00:00:00')
+            
+            dashboard.close()
+            self.assertFalse(dashboard._db_writer.is_alive())
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_dashboard_background_metrics_include_queued_trades(self):
+        """Test metrics and the summary count trades still queued for the writer"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json",
+                                              background_writes=True)
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            dashboard.log_trade({'timestamp': '2024-01-01T00:00:00', 'symbol': 'BTC/USDT',
+                                 'strategy': StrategyNames.ICHIMOKU_TREND, 'action': 'SELL',
+                                 'quantity': 0.1, 'price': 45000, 'pnl': 25.0})
+            dashboard.log_performance_metrics()
+            summary = dashboard.get_dashboard_summary()
+            
+            import sqlite3
+            conn = sqlite3.connect(temp_db)
+            total_trades = conn.execute("SELECT total_trades FROM performance_metrics").fetchone()[0]
+            conn.close()
+            
+            self.assertEqual(total_trades, 1)
+            self.assertEqual(summary['metrics']['total_trades'], 1)
+            self.assertEqual(summary['metrics']['winning_trades'], 1)
+            
+            dashboard.close()
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_dashboard_background_state_and_db_writes(self):
+        """Test the inherited save_state and dashboard rows use separate writers"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json",
+                                              background_writes=True)
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            self.assertTrue(dashboard.save_state({}, {}, 'x', {}, []))
+            dashboard.log_system_health()
+            dashboard.flush()
+            dashboard.flush_db()
+            
+            self.assertTrue(dashboard._writer.is_alive())
+            self.assertTrue(dashboard._db_writer.is_alive())
+            self.assertEqual(dashboard.load_state()['last_processed_timestamp'], 'x')
+            
+            dashboard.close()
+            self.assertFalse(dashboard._writer.is_alive())
+            self.assertFalse(dashboard._db_writer.is_alive())
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_dashboard_summary_cache(self):
+        """Test the dashboard summary is cached until the next write"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json")
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            summary = dashboard.get_dashboard_summary()
+            self.assertIsNone(summary['health'])
+            self.assertIs(dashboard.get_dashboard_summary(), summary)
+            
+            dashboard.log_system_health(status="running")
+            summary = dashboard.get_dashboard_summary()
+            self.assertEqual(summary['health']['status'], "running")
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_daily_equity_tracks_latest_snapshot(self):
+        """Test the per-day closing equity follows the latest snapshot of each day"""
+        temp_dir = tempfile.mkdtemp()
+        temp_db = Path(temp_dir) / "test_dashboard.db"
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json")
+            dashboard.db_path = str(temp_db)
+            dashboard.init_database()
+            
+            for timestamp, equity in [('2024-01-01T18:00:00', 1100.0),
+                                      ('2024-01-01T09:00:00', 1000.0),
+                                      ('2024-01-02T09:00:00', 1200.0)]:
+                dashboard.log_equity_snapshot_direct({'timestamp': timestamp, 'total_equity': equity})
+            
+            import sqlite3
+            conn = sqlite3.connect(temp_db)
+            rows = conn.execute("SELECT day, close_equity FROM daily_equity ORDER BY day").fetchall()
+            conn.close()
+            
+            self.assertEqual(rows, [('2024-01-01', 1100.0), ('2024-01-02', 1200.0)])
+            
+            # Deleting a day's closing snapshot falls back to its next latest
+            conn = sqlite3.connect(temp_db)
+            conn.execute("DELETE FROM equity_snapshots WHERE timestamp >= '2024-01-01T12:00:00'")
+            conn.commit()
+            rows = conn.execute("SELECT day, close_equity FROM daily_equity ORDER BY day").fetchall()
+            conn.close()
+            
+            self.assertEqual(rows, [('2024-01-01', 1000.0)])
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
 class TestPositionManagerValidation(unittest.TestCase):
     """Test position manager input validation"""
     
@@ -236,6 +574,34 @@ class TestPositionManagerValidation(unittest.TestCase):
         self.assertIsNotNone(pos_id)
         self.assertIn(pos_id, self.position_manager.positions)
     
+    def test_positions_as_arrays(self):
+        """Test open positions are exposed as parallel arrays"""
+        self.position_manager.add_position("BTC/USDT", StrategyNames.ICHIMOKU_TREND, 0.1, 45000, "2024-01-01T00:00:00")
+        closed_id = self.position_manager.add_position("ETH/USDT", StrategyNames.RSI_REVERSAL, 2, 3000, "2024-01-01T00:00:00")
+        self.position_manager.close_position(closed_id, 3100, "2024-01-02T00:00:00")
+        self.position_manager.update_unrealized_pnl({"BTC/USDT": 46000})
+        
+        arrays = self.position_manager.positions_as_arrays()
+        
+        self.assertEqual(list(arrays["strategy"]), [StrategyNames.ICHIMOKU_TREND])
+        self.assertEqual(list(arrays["symbol"]), ["BTC/USDT"])
+        self.assertEqual(arrays["quantity"].dtype, np.float64)
+        self.assertAlmostEqual(arrays["quantity"][0], 0.1)
+        self.assertAlmostEqual(arrays["unrealized"][0], 100.0)
+    
+    def test_open_positions_by_key(self):
+        """Test open positions are grouped by (symbol, strategy)"""
+        btc_id = self.position_manager.add_position("BTC/USDT", StrategyNames.ICHIMOKU_TREND, 0.1, 45000, "2024-01-01T00:00:00")
+        closed_id = self.position_manager.add_position("BTC/USDT", StrategyNames.RSI_REVERSAL, 0.2, 45000, "2024-01-01T00:00:00")
+        self.position_manager.close_position(closed_id, 46000, "2024-01-02T00:00:00")
+        
+        grouped = self.position_manager.open_positions_by_key()
+        
+        self.assertEqual(list(grouped), [("BTC/USDT", StrategyNames.ICHIMOKU_TREND)])
+        self.assertEqual(list(grouped[("BTC/USDT", StrategyNames.ICHIMOKU_TREND)]), [btc_id])
+        self.assertEqual(grouped[("BTC/USDT", StrategyNames.ICHIMOKU_TREND)],
+                         self.position_manager.get_open_positions("BTC/USDT", StrategyNames.ICHIMOKU_TREND))
+    
     def test_invalid_position_parameters(self):
         """Test validation of invalid position parameters"""
         # Invalid symbol
@@ -275,13 +641,284 @@ class TestExchangeErrorHandling(unittest.TestCase):
         self.assertIsInstance(retryable_error, ExchangeError)
         self.assertNotIsInstance(non_retryable_error, RetryableExchangeError)
     
+    @patch('exchange_handler.time.sleep')
+    def test_retry_backoff_is_jittered(self, mock_sleep):
+        """Test retries wait a random time within the backoff bound"""
+        from exchange_handler import retry_on_failure
+        
+        calls = []
+        
+        @retry_on_failure(max_retries=3, delay=1.0, backoff=2.0)
+        def flaky():
+            calls.append(1)
+            if len(calls) < 4:
+                raise RetryableExchangeError("Network timeout")
+            return "ok"
+        
+        self.assertEqual(flaky(), "ok")
+        self.assertEqual(flaky.__name__, "flaky")
+        waits = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(len(waits), 3)
+        for attempt, wait in enumerate(waits):
+            self.assertGreaterEqual(wait, 0)
+            self.assertLessEqual(wait, 2.0 ** attempt)
+    
+    def test_async_retry(self):
+        """Test the async retry decorator retries and then gives up"""
+        import asyncio
+        from exchange_handler import async_retry_on_failure
+        
+        calls = []
+        
+        @async_retry_on_failure(max_retries=2, delay=0.001)
+        async def always_fails():
+            calls.append(1)
+            raise RetryableExchangeError("Network timeout")
+        
+        with self.assertRaises(RetryableExchangeError):
+            asyncio.run(always_fails())
+        self.assertEqual(len(calls), 3)
+    
+    def test_health_check_reuses_markets_and_balance(self):
+        """Test health checks skip loaded markets and recent balance fetches"""
+        from exchange_handler import check_exchange_health
+        
+        exchange = MagicMock()
+        exchange.markets = {'BTC/USDT': {}}
+        
+        first = check_exchange_health(exchange)
+        second = check_exchange_health(exchange)
+        
+        self.assertTrue(first['markets_loaded'] and second['markets_loaded'])
+        self.assertTrue(first['balance_accessible'] and second['balance_accessible'])
+        exchange.load_markets.assert_not_called()
+        self.assertEqual(exchange.fetch_balance.call_count, 1)
+    
+    @patch('exchange_handler.HEALTH_PROBE_TIMEOUT', 0.5)
+    def test_health_check_probes_run_concurrently(self):
+        """Test a hung probe times out without holding up the other"""
+        import threading
+        from exchange_handler import check_exchange_health
+        
+        release = threading.Event()
+        exchange = MagicMock()
+        exchange.markets = {}
+        exchange.load_markets.side_effect = lambda: release.wait(5)
+        exchange.fetch_balance.side_effect = Exception("Invalid API key")
+        
+        try:
+            health = check_exchange_health(exchange)
+        finally:
+            release.set()
+        
+        self.assertFalse(health['markets_loaded'])
+        self.assertFalse(health['balance_accessible'])
+        self.assertEqual(len(health['errors']), 2)
+        self.assertIn("timed out", health['errors'][0])
+        self.assertIn("Invalid API key", health['errors'][1])
+    
+    def test_ohlcv_cache_skips_refetch(self):
+        """Test cached closed candles are reused and only newer ones fetched"""
+        from exchange_handler import fetch_historical_ohlcv
+        
+        hour_ms = 3600 * 1000
+        
+        def fetch_ohlcv(symbol, timeframe, since, limit):
+            first = -(-since // hour_ms) * hour_ms
+            return [[first + i * hour_ms, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(limit)]
+        
+        exchange = MagicMock()
+        exchange.id = "bybit"
+        exchange.parse8601.side_effect = lambda text: int(pd.Timestamp(text).value // 10**6)
+        exchange.parse_timeframe.return_value = 3600
+        exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+        
+        start_ms = int(pd.Timestamp("2024-01-01").value // 10**6)
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            def fetch(limit):
+                return fetch_historical_ohlcv(exchange, "BTC/USDT", "1h", "2024-01-01", "2024-01-02",
+                                              limit=limit, cache_dir=cache_dir)
+            
+            first = fetch(30)
+            self.assertEqual(len(first), 30)
+            self.assertEqual(exchange.fetch_ohlcv.call_count, 1)
+            
+            # Same request again: served from the cache
+            pd.testing.assert_frame_equal(fetch(30), first)
+            self.assertEqual(exchange.fetch_ohlcv.call_count, 1)
+            
+            # Larger request: only the candles after the cache are requested
+            larger = fetch(100)
+            self.assertEqual(len(larger), 48)
+            self.assertEqual(exchange.fetch_ohlcv.call_count, 2)
+            self.assertEqual(exchange.fetch_ohlcv.call_args.kwargs['since'], start_ms + 29 * hour_ms + 1)
+            self.assertEqual(exchange.fetch_ohlcv.call_args.kwargs['limit'], 70)
+            pd.testing.assert_frame_equal(larger.iloc[:30], first)
+            
+            pd.testing.assert_frame_equal(fetch(100), larger)
+            self.assertEqual(exchange.fetch_ohlcv.call_count, 2)
+    
+    def test_ohlcv_cache_hit_with_nothing_new(self):
+        """Test cached candles are returned when the exchange has nothing after them"""
+        from exchange_handler import fetch_historical_ohlcv
+        
+        hour_ms = 3600 * 1000
+        start_ms = int(pd.Timestamp("2024-01-01").value // 10**6)
+        
+        exchange = MagicMock()
+        exchange.id = "bybit"
+        exchange.parse8601.side_effect = lambda text: int(pd.Timestamp(text).value // 10**6)
+        exchange.parse_timeframe.return_value = 3600
+        exchange.fetch_ohlcv.return_value = [
+            [start_ms + i * hour_ms, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(30)
+        ]
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = fetch_historical_ohlcv(exchange, "BTC/USDT", "1h", "2024-01-01",
+                                           limit=100, cache_dir=cache_dir)
+            self.assertEqual(len(first), 30)
+            
+            # Open-ended request: the candles after the cache come back empty
+            exchange.fetch_ohlcv.return_value = []
+            again = fetch_historical_ohlcv(exchange, "BTC/USDT", "1h", "2024-01-01",
+                                           limit=100, cache_dir=cache_dir)
+            self.assertEqual(exchange.fetch_ohlcv.call_count, 2)
+            self.assertEqual(exchange.fetch_ohlcv.call_args.kwargs['since'], start_ms + 29 * hour_ms + 1)
+            pd.testing.assert_frame_equal(again, first)
+    
+    def test_async_ohlcv_fetches_whole_range(self):
+        """Test the async fetch pages through a bounded date range"""
+        import asyncio
+        from exchange_handler import fetch_historical_ohlcv_async
+        
+        hour_ms = 3600 * 1000
+        start_ms = int(pd.Timestamp("2024-01-01").value // 10**6)
+        
+        def fetch_ohlcv(symbol, timeframe, since, limit):
+            # One candle past the page end, as exchanges that include the boundary do
+            return [[since + i * hour_ms, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(limit + 1)]
+        
+        exchange = MagicMock()
+        exchange.parse8601.side_effect = lambda text: int(pd.Timestamp(text).value // 10**6)
+        exchange.parse_timeframe.return_value = 3600
+        exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+        
+        df = asyncio.run(fetch_historical_ohlcv_async(
+            exchange, "BTC/USDT", "1h", "2024-01-01", "2024-01-02", limit=10
+        ))
+        
+        self.assertEqual(exchange.fetch_ohlcv.call_count, 5)
+        self.assertEqual(len(df), 48)
+        self.assertEqual(df.index[0], pd.Timestamp(start_ms, unit="ms"))
+        self.assertTrue(df.index.is_unique and df.index.is_monotonic_increasing)
+    
+    def test_async_ohlcv_shares_rate_limit(self):
+        """Test concurrent async fetches on one sync client share its rate limit"""
+        import asyncio
+        import time
+        from exchange_handler import fetch_historical_ohlcv_async
+        
+        hour_ms = 3600 * 1000
+        call_times = []
+        
+        def fetch_ohlcv(symbol, timeframe, since, limit):
+            call_times.append(time.monotonic())
+            return [[since + i * hour_ms, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(limit)]
+        
+        exchange = MagicMock()
+        exchange.rateLimit = 20
+        exchange.parse8601.side_effect = lambda text: int(pd.Timestamp(text).value // 10**6)
+        exchange.parse_timeframe.return_value = 3600
+        exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+        
+        async def backfill():
+            return await asyncio.gather(*(
+                fetch_historical_ohlcv_async(exchange, symbol, "1h", "2024-01-01", "2024-01-02", limit=10)
+                for symbol in ("BTC/USDT", "ETH/USDT")
+            ))
+        
+        frames = asyncio.run(backfill())
+        
+        self.assertEqual([len(df) for df in frames], [48, 48])
+        self.assertEqual(len(call_times), 10)
+        call_times.sort()
+        gaps = [later - earlier for earlier, later in zip(call_times, call_times[1:])]
+        self.assertGreaterEqual(min(gaps), 0.015)
+    
+    def test_fetch_free_balance(self):
+        """Test the free balance is read from the unified balance structure"""
+        from exchange_handler import fetch_free_balance
+        
+        exchange = MagicMock()
+        exchange.fetch_balance.return_value = {'USDT': {'free': 750.5, 'total': 1000.0}, 'BTC': {'free': None}}
+        
+        self.assertEqual(fetch_free_balance(exchange), 750.5)
+        self.assertEqual(fetch_free_balance(exchange, "BTC"), 0.0)
+        self.assertEqual(fetch_free_balance(exchange, "ETH"), 0.0)
+    
+    def test_batch_orders_use_batch_endpoint(self):
+        """Test batch orders are validated up front and sent in chunks"""
+        from exchange_handler import execute_trades_batch
+        
+        exchange = MagicMock()
+        exchange.has = {'createOrders': True}
+        exchange.create_orders.side_effect = lambda batch: [{'id': order['symbol']} for order in batch]
+        orders = [{'symbol': 'btc/usdt', 'side': 'buy', 'amount': 0.1}] * 12
+        
+        receipts = execute_trades_batch(orders, exchange_obj=exchange)
+        
+        self.assertEqual(len(receipts), 12)
+        self.assertEqual([len(call.args[0]) for call in exchange.create_orders.call_args_list], [10, 2])
+        self.assertEqual(receipts[0], {'id': 'BTC/USDT'})
+        
+        with self.assertRaises(ExchangeError):
+            execute_trades_batch(orders + [{'symbol': 'BTC/USDT', 'side': 'hold', 'amount': 1}],
+                                 exchange_obj=exchange)
+        self.assertEqual(exchange.create_orders.call_count, 2)
+    
+    def test_markets_cache_reused(self):
+        """Test markets saved by one start-up are reused by the next"""
+        from exchange_handler import _load_markets
+        
+        markets = {'BTC/USDT': {'id': 'BTCUSDT', 'symbol': 'BTC/USDT'}}
+        
+        def new_client():
+            exchange = MagicMock()
+            exchange.id = "bybit"
+            exchange.markets = {}
+            exchange.currencies = {'USDT': {'code': 'USDT'}}
+            exchange.load_markets.side_effect = lambda: setattr(exchange, 'markets', markets) or markets
+            return exchange
+        
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                patch('exchange_handler.MARKETS_CACHE_DIR', cache_dir):
+            first = new_client()
+            _load_markets(first, testnet=True)
+            first.load_markets.assert_called_once()
+            with open(Path(cache_dir) / "bybit_testnet.json") as f:
+                self.assertEqual(json.load(f)['markets'], markets)
+            
+            second = new_client()
+            _load_markets(second, testnet=True)
+            second.load_markets.assert_not_called()
+            second.set_markets.assert_called_once_with(markets, {'USDT': {'code': 'USDT'}})
+            
+            # Mainnet markets are cached separately
+            third = new_client()
+            _load_markets(third, testnet=False)
+            third.load_markets.assert_called_once()
+    
     @patch('exchange_handler.ccxt')
     def test_exchange_initialization_retry(self, mock_ccxt):
         """Test exchange initialization with retry logic"""
         from exchange_handler import initialize_exchange, ExchangeError
         
-        # Mock bybit exchange
+        # Mock bybit exchange (a new client has no markets yet)
         mock_exchange = MagicMock()
+        mock_exchange.id = "bybit"
+        mock_exchange.markets = {}
+        mock_exchange.currencies = {}
         mock_exchange.load_markets.side_effect = [
             Exception("Network error"),  # First attempt fails
             None  # Second attempt succeeds
@@ -294,14 +931,80 @@ class TestExchangeErrorHandling(unittest.TestCase):
         test_secret = "b" * 32   # Valid length secret
         
         try:
-            exchange, balance = initialize_exchange("bybit", test_api_key, test_secret)
+            with tempfile.TemporaryDirectory() as cache_dir, \
+                    patch('exchange_handler.MARKETS_CACHE_DIR', cache_dir):
+                exchange, balance = initialize_exchange("bybit", test_api_key, test_secret)
             # Should have been called twice (original + retry)
             self.assertEqual(mock_exchange.load_markets.call_count, 2)
             self.assertIsNotNone(exchange)
+            
+            # A health check right after start-up reuses the balance just fetched
+            from exchange_handler import check_exchange_health
+            health = check_exchange_health(exchange)
+            self.assertTrue(health['balance_accessible'])
+            self.assertEqual(mock_exchange.fetch_balance.call_count, 1)
         except ExchangeError as e:
             # If it still fails due to validation, that's expected behavior
             self.assertIn("Invalid API key", str(e))
 
+    def test_exchange_name_is_case_insensitive(self):
+        """Test EXCHANGE_NAME values like 'Bybit' or 'BINANCE' pick the right initializer"""
+        from exchange_handler import initialize_exchange
+        
+        bybit = MagicMock(return_value=("bybit", 1.0))
+        binance = MagicMock(return_value=("binance", 2.0))
+        with patch.dict('exchange_handler._EXCHANGE_INITIALIZERS',
+                        {'bybit': bybit, 'binance': binance}):
+            self.assertEqual(initialize_exchange("Bybit"), ("bybit", 1.0))
+            self.assertEqual(initialize_exchange("BINANCE"), ("binance", 2.0))
+            with self.assertRaises(ExchangeError):
+                initialize_exchange("Kraken")
+
+class TestDashboardIntegration(unittest.TestCase):
+    """Test batched dashboard writes"""
+    
+    def test_backtest_equity_batch_insert(self):
+        """Test the whole equity curve lands in one batch, missing columns as 0"""
+        import pandas as pd
+        import sqlite3
+        import dashboard_integration
+        
+        temp_dir = tempfile.mkdtemp()
+        temp_db = str(Path(temp_dir) / "test_dashboard.db")
+        
+        try:
+            dashboard = DashboardStateManager(state_file=temp_dir + "/test_state.json")
+            dashboard.db_path = temp_db
+            dashboard.init_database()
+            
+            integration = dashboard_integration.DashboardIntegration()
+            integration._dashboard_state = dashboard
+            
+            equity = pd.DataFrame(
+                {'ICHIMOKU': [3600.0, 3650.0, 3700.0], 'TOTAL': [4000.0, 4050.0, 4100.0]},
+                index=pd.date_range('2024-01-01', periods=3, freq='4h')
+            )
+            integration.log_backtest_results(equity, [])
+            
+            conn = sqlite3.connect(temp_db)
+            rows = conn.execute(
+                "SELECT timestamp, total_equity, ichimoku_equity, reversal_equity "
+                "FROM equity_snapshots ORDER BY id"
+            ).fetchall()
+            conn.close()
+            
+            self.assertEqual(rows, [
+                ('2024-01-01T00:00:00', 4000.0, 3600.0, 0.0),
+                ('2024-01-01T04:00:00', 4050.0, 3650.0, 0.0),
+                ('2024-01-01T08:00:00', 4100.0, 3700.0, 0.0),
+            ])
+            
+            dashboard.close()
+            
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
 class TestSystemIntegration(unittest.TestCase):
     """Test overall system integration after fixes"""
     
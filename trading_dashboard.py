@@ -57,16 +57,19 @@ def load_database_data():
         
         conn = sqlite3.connect(DATABASE_PATH)
         
-        # Load trades
+        # Load trades (every query selects only the columns the dashboard renders)
         trades_query = """
-        SELECT * FROM trades 
+        SELECT timestamp, symbol, strategy, action, quantity, price, pnl, paper_traded
+        FROM trades 
         ORDER BY timestamp DESC
         """
         trades_df = pd.read_sql_query(trades_query, conn)
         
         # Load equity snapshots
         equity_query = """
-        SELECT * FROM equity_snapshots 
+        SELECT timestamp, total_equity, ichimoku_equity, reversal_equity,
+               open_positions, unrealized_pnl, daily_pnl
+        FROM equity_snapshots 
         ORDER BY timestamp DESC
         LIMIT 1000
         """
@@ -76,7 +79,8 @@ def load_database_data():
         health_df = pd.DataFrame()
         try:
             health_query = """
-            SELECT * FROM system_health 
+            SELECT timestamp, status, api_connection, error_count
+            FROM system_health 
             ORDER BY timestamp DESC 
             LIMIT 10
             """
@@ -223,14 +227,16 @@ def calculate_metrics(data):
     
     # Trade statistics (handle empty trades gracefully)
     if not data['trades'].empty:
-        completed_trades = data['trades'][data['trades']['action'] == 'SELL']
-        total_trades = len(completed_trades)
-        winning_trades = len(completed_trades[completed_trades['pnl'] > 0])
+        # Work on the closed-trade P&L array once instead of re-filtering the frame per statistic
+        trades = data['trades']
+        pnl = trades['pnl'].to_numpy(dtype=float)[(trades['action'] == 'SELL').to_numpy()]
+        total_trades = len(pnl)
+        winning_trades = int((pnl > 0).sum())
         win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
         
         # Profit factor
-        gross_profit = completed_trades[completed_trades['pnl'] > 0]['pnl'].sum()
-        gross_loss = abs(completed_trades[completed_trades['pnl'] < 0]['pnl'].sum())
+        gross_profit = pnl[pnl > 0].sum()
+        gross_loss = abs(pnl[pnl < 0].sum())
         profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0
     else:
         # No trades data available
@@ -238,9 +244,12 @@ def calculate_metrics(data):
         win_rate = 0
         profit_factor = 0
     
+    # Equity series newest-first, as loaded; extracted once for drawdown and return
+    total_equity = data['equity']['total_equity'].to_numpy(dtype=float)
+    
     # Max drawdown calculation
-    if not data['equity'].empty:
-        equity_values = data['equity']['total_equity'].values[::-1]  # Reverse for chronological order
+    if len(total_equity) > 0:
+        equity_values = total_equity[::-1]  # Reverse for chronological order
         cummax = np.maximum.accumulate(equity_values)
         drawdown = (cummax - equity_values) / cummax
         max_drawdown = np.max(drawdown) * 100
@@ -248,9 +257,9 @@ def calculate_metrics(data):
         max_drawdown = 0
     
     # Total return
-    if not data['equity'].empty and len(data['equity']) > 1:
-        initial_equity = data['equity']['total_equity'].iloc[-1]  # Oldest record
-        current_equity = data['equity']['total_equity'].iloc[0]   # Latest record
+    if len(total_equity) > 1:
+        initial_equity = total_equity[-1]  # Oldest record
+        current_equity = total_equity[0]   # Latest record
         total_return = ((current_equity - initial_equity) / initial_equity * 100) if initial_equity > 0 else 0
     else:
         total_return = 0